@@ -0,0 +1,222 @@
+"""Benchmarks of the Explorer against an in-process stand-in for Sumo
+
+Runs typical workloads against a synthetic case served by FakeSumo, with
+configurable size and latency per request, and reports the best time and
+the number of requests of each benchmark. Requests are sent by a
+SumoClient through an httpx mock transport, so the request path of the
+wrapper is measured too; with --no-wrapper, FakeSumo is used as the
+client directly. Results can be saved, and compared with results saved
+from another commit to report regressions.
+
+Usage:
+
+    git checkout main
+    python benchmarks/bench_explorer.py --output main.json
+
+    git checkout my-branch
+    python benchmarks/bench_explorer.py --compare main.json
+
+The comparison exits with status 1 if any benchmark is slower than the
+baseline by more than `--threshold`, or sends more requests.
+"""
+import argparse
+import json
+import subprocess
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from fmu.sumo.explorer import Explorer  # noqa: E402
+from fake_sumo import FakeSumo, CASE_UUID, wrapper_client  # noqa: E402
+
+
+def paging(case):
+    """Page through every surface in the case"""
+    for _ in case.surfaces:
+        pass
+
+
+def paging_prefetch(case):
+    """Page through every surface, reading ahead"""
+    for _ in case.surfaces.prefetch(2):
+        pass
+
+
+def facets(case):
+    """Get unique values of several fields"""
+    fields = ["data.name.keyword", "fmu.iteration.name.keyword"]
+    case.surfaces.facets(fields + ["fmu.realization.id"])
+
+
+def filter_chain(case):
+    """Narrow down a collection with chained filters, then count"""
+    surfaces = (
+        case.surfaces.filter(iteration="iter-0")
+        .filter(name="surface_0")
+        .filter(realization=[0, 1, 2])
+        .filter(stage="realization")
+    )
+    len(surfaces)
+
+
+def blob_decode(case):
+    """Download and decode the surfaces of one realization"""
+    for surface in case.surfaces.filter(iteration="iter-0", realization=0):
+        surface.to_regular_surface()
+
+
+def aggregation(case):
+    """Aggregate one surface over the realizations"""
+    surfaces = case.surfaces.filter(iteration="iter-0", name="surface_0")
+    surfaces.mean()
+    surfaces.p90()
+
+
+BENCHMARKS = [
+    paging,
+    paging_prefetch,
+    facets,
+    filter_chain,
+    blob_decode,
+    aggregation,
+]
+
+
+def run(benchmark, fake: FakeSumo, client, repeat: int) -> dict:
+    """Run benchmark on a new Explorer, returning best time and requests"""
+
+    def once():
+        explorer = Explorer(sumo=client)
+        benchmark(explorer.get_case_by_uuid(CASE_UUID))
+
+    fake.requests.clear()
+    once()
+    requests = len(fake.requests)
+    seconds = min(timeit.Timer(once).repeat(number=1, repeat=repeat))
+
+    return {"seconds": seconds, "requests": requests}
+
+
+def git_commit() -> str:
+    """Get the commit of the working tree, if in a git repository"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Print results next to baseline, returning regressed benchmarks"""
+    print(f"\nbaseline: {baseline.get('commit')}")
+    print(f"{'':20}{'baseline':>10}{'current':>10}{'change':>9}", end="")
+    print(f"{'requests':>14}")
+    regressions = []
+
+    for name, result in results.items():
+        before = baseline["results"].get(name)
+
+        if before is None:
+            continue
+
+        change = result["seconds"] / before["seconds"] - 1
+        slower = change > threshold
+        more = result["requests"] > before["requests"]
+        flag = "  REGRESSION" if slower or more else ""
+        print(
+            f"{name:20}{before['seconds'] * 1000:8.1f}ms"
+            f"{result['seconds'] * 1000:8.1f}ms{change:+9.0%}"
+            f"{before['requests']:7d} ->{result['requests']:4d}{flag}"
+        )
+
+        if flag:
+            regressions.append(name)
+
+    return regressions
+
+
+def main():
+    """Run the benchmarks and print timings"""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--realizations", type=int, default=50)
+    parser.add_argument("--surfaces", type=int, default=10)
+    parser.add_argument("--ncol", type=int, default=100)
+    parser.add_argument("--nrow", type=int, default=80)
+    parser.add_argument(
+        "--latency", type=float, default=0.005, help="seconds per request"
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--no-wrapper",
+        action="store_true",
+        help="use FakeSumo as client instead of SumoClient",
+    )
+    parser.add_argument("--output", help="file to save results to")
+    parser.add_argument("--compare", help="results file of the baseline")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="relative slowdown reported as regression",
+    )
+    parser.add_argument("benchmarks", nargs="*", help="benchmarks to run")
+    args = parser.parse_args()
+
+    config = {
+        "realizations": args.realizations,
+        "surfaces": args.surfaces,
+        "shape": [args.ncol, args.nrow],
+        "latency": args.latency,
+        "wrapper": not args.no_wrapper,
+    }
+    fake = FakeSumo(
+        realizations=args.realizations,
+        surfaces=args.surfaces,
+        shape=(args.ncol, args.nrow),
+        latency=args.latency,
+    )
+    client = fake if args.no_wrapper else wrapper_client(fake)
+    selected = [
+        benchmark
+        for benchmark in BENCHMARKS
+        if not args.benchmarks or benchmark.__name__ in args.benchmarks
+    ]
+
+    print(f"commit: {git_commit()}, case: {config}")
+    print(f"{'':20}{'time':>10}{'requests':>10}")
+    results = {}
+
+    for benchmark in selected:
+        result = run(benchmark, fake, client, args.repeat)
+        results[benchmark.__name__] = result
+        print(
+            f"{benchmark.__name__:20}{result['seconds'] * 1000:8.1f}ms"
+            f"{result['requests']:10d}"
+        )
+
+    report = {"commit": git_commit(), "config": config, "results": results}
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(report, output, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+
+        if baseline["config"] != config:
+            print("\nwarning: baseline was run on a different case")
+
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
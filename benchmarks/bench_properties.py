@@ -0,0 +1,128 @@
+"""Micro-benchmark of metadata property access on Surface objects
+
+Reads one metadata path with Document._get_property alone, reads the
+properties typically used for grouping, and sorts and groups surfaces by
+realization. The current property access is compared with the previous
+implementation of Document._get_property, which copied the metadata
+dictionary on every read.
+
+The metadata has few top level keys, so the saved copy is small next to
+the rest of a property read, and the differences are within the noise of
+a single run. Use a high --repeat and compare several runs.
+
+Usage:
+
+    python benchmarks/bench_properties.py [--objects 50000] [--repeat 5]
+"""
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from fmu.sumo.explorer.objects.surface import Surface  # noqa: E402
+
+
+class CopyingSurface(Surface):
+    """Surface with property access as implemented before"""
+
+    __slots__ = ()
+
+    def _get_property(self, path):
+        curr = self._metadata.copy()
+
+        for key in path:
+            if key in curr:
+                curr = curr[key]
+            else:
+                return None
+
+        return curr
+
+
+def make_document(index):
+    """Make a surface document shaped like a search hit"""
+    return {
+        "_id": f"{index:08d}-0000-4000-8000-000000000000",
+        "_source": {
+            "data": {
+                "name": f"surface_{index % 20}",
+                "tagname": "ds_extract_geogrid",
+                "format": "irap_binary",
+                "stratigraphic": True,
+                "vertical_domain": "depth",
+                "time": {"t0": {"value": "2018-01-01T00:00:00"}},
+                "spec": {"ncol": 280, "nrow": 440},
+                "bbox": {"xmin": 0.0, "xmax": 1.0},
+            },
+            "fmu": {
+                "case": {"name": "bench_case", "user": {"id": "bench"}},
+                "iteration": {"name": "iter-0"},
+                "realization": {"id": index % 100},
+                "context": {"stage": "realization"},
+            },
+            "_sumo": {"status": "keep", "blob_md5": "abc"},
+            "access": {"asset": {"name": "Drogon"}},
+            "masterdata": {"smda": {"field": [{"identifier": "DROGON"}]}},
+            "file": {"relative_path": "share/results/maps/surface.gri"},
+        },
+    }
+
+
+def get_property(surfaces):
+    """Read one metadata path with _get_property"""
+    path = ("fmu", "realization", "id")
+    return [surf._get_property(path) for surf in surfaces]
+
+
+def read_properties(surfaces):
+    """Read the properties typically used for grouping"""
+    return [
+        (surf.name, surf.iteration, surf.realization, surf.timestamp)
+        for surf in surfaces
+    ]
+
+
+def group_by_realization(surfaces):
+    """Sort and group surfaces by realization"""
+    ordered = sorted(surfaces, key=lambda surf: surf.realization)
+    groups = {}
+
+    for surf in ordered:
+        groups.setdefault(surf.realization, []).append(surf)
+
+    return groups
+
+
+def best_time(func, surfaces, repeat):
+    """Best time of applying func to the surfaces"""
+    timer = timeit.Timer(lambda: func(surfaces))
+    return min(timer.repeat(number=1, repeat=repeat))
+
+
+def main():
+    """Run the benchmark and print timings"""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--objects", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    documents = [make_document(i) for i in range(args.objects)]
+    copying = [CopyingSurface(None, doc) for doc in documents]
+    current = [Surface(None, doc) for doc in documents]
+
+    print(f"objects: {args.objects}")
+    print(f"{'':24}{'copying':>10}{'current':>10}{'speedup':>10}")
+
+    for func in (get_property, read_properties, group_by_realization):
+        before = best_time(func, copying, args.repeat)
+        after = best_time(func, current, args.repeat)
+        print(
+            f"{func.__name__:24}{before * 1000:8.1f}ms{after * 1000:8.1f}ms"
+            f"{before / after:9.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,576 @@
+"""In-process stand-in for the Sumo API, serving a synthetic case
+
+FakeSumo has the interface of the SumoClient methods used by the
+explorer, and serves /search, /pit, /aggregate and /objects(...)/blob
+from memory. It implements the parts of the Elasticsearch query language
+the explorer uses: bool, term, terms, exists and range queries, _source
+filtering, from/size and search_after paging, slices, and terms and
+composite aggregations.
+
+FakeSumo also serves HTTP requests through an httpx mock transport, so a
+real SumoClient can be used on it with `wrapper_client`, measuring the
+request path of the wrapper and httpx as well.
+
+Usage:
+
+    sumo = Explorer(sumo=wrapper_client(FakeSumo(realizations=50)))
+    case = sumo.get_case_by_uuid(CASE_UUID)
+
+or, without the wrapper:
+
+    sumo = Explorer(sumo=FakeSumo(realizations=50, latency=0.02))
+"""
+from typing import Dict, List, Tuple
+import hashlib
+import io
+import json
+import time
+import uuid as uuidlib
+import zipfile
+import httpx
+import jwt
+import numpy as np
+import xtgeo
+from sumo.wrapper import SumoClient, sumo_client
+
+CASE_UUID = "00000000-0000-4000-8000-000000000000"
+
+ITERATIONS = ("iter-0", "iter-1")
+
+ENV = "fake"
+BASE_URL = "https://fake-sumo/api/v1"
+
+# replaces the well-known configuration the wrapper downloads from Sumo
+WELL_KNOWN = {
+    "tenant_id": "fake-tenant",
+    "authority": "https://fake-login/",
+    "envs": {
+        ENV: {
+            "resource_id": "fake-resource",
+            "base_url": BASE_URL,
+            "client_id": "fake-client",
+        }
+    },
+}
+
+OPERATIONS = {
+    "mean": lambda stack: stack.mean(axis=0),
+    "min": lambda stack: stack.min(axis=0),
+    "max": lambda stack: stack.max(axis=0),
+    "std": lambda stack: stack.std(axis=0),
+    "p10": lambda stack: _percentile(stack, 10),
+    "p50": lambda stack: _percentile(stack, 50),
+    "p90": lambda stack: _percentile(stack, 90),
+}
+
+
+def _percentile(stack: np.ma.MaskedArray, percent: float) -> np.ndarray:
+    values = np.nanpercentile(stack.filled(np.nan), percent, axis=0)
+    return np.ma.masked_invalid(values)
+
+
+class FakeResponse:
+    """Response with the attributes of a SumoClient response"""
+
+    def __init__(self, content: bytes, status_code: int = 200) -> None:
+        self.content = content
+        self.status_code = status_code
+
+    @property
+    def text(self) -> str:
+        """Content as text"""
+        return self.content.decode("utf-8")
+
+    def json(self):
+        """Content parsed as JSON"""
+        return json.loads(self.content)
+
+
+def _dumps(obj) -> bytes:
+    return json.dumps(obj).encode("utf-8")
+
+
+def _get_path(source: Dict, field: str):
+    if field == "_id":
+        return source.get("_id")
+
+    if field.endswith(".keyword"):
+        field = field[: -len(".keyword")]
+
+    curr = source
+
+    for key in field.split("."):
+        if isinstance(curr, dict) and key in curr:
+            curr = curr[key]
+        else:
+            return None
+
+    return curr
+
+
+def _values(source: Dict, field: str) -> List:
+    val = _get_path(source, field)
+
+    if val is None:
+        return []
+
+    return val if isinstance(val, list) else [val]
+
+
+def _match(doc: Dict, query: Dict) -> bool:
+    """Check if a document matches a query"""
+    for kind, body in (query or {}).items():
+        if kind == "bool":
+            if not all(_match(doc, c) for c in body.get("must", [])):
+                return False
+
+            if any(_match(doc, c) for c in body.get("must_not", [])):
+                return False
+
+            should = body.get("should", [])
+            need = body.get("minimum_should_match", 1)
+
+            if should and sum(_match(doc, c) for c in should) < need:
+                return False
+        elif kind == "term":
+            ((field, val),) = body.items()
+
+            if isinstance(val, dict):
+                val = val["value"]
+
+            if val not in _values(doc, field):
+                return False
+        elif kind == "terms":
+            ((field, vals),) = body.items()
+            found = set(map(str, _values(doc, field)))
+
+            if not set(map(str, vals)) & found:
+                return False
+        elif kind == "exists":
+            if _get_path(doc, body["field"]) is None:
+                return False
+        elif kind == "range":
+            ((field, cond),) = body.items()
+            vals = _values(doc, field)
+
+            if not vals:
+                return False
+
+            if "gte" in cond and not vals[0] >= cond["gte"]:
+                return False
+
+            if "lte" in cond and not vals[0] <= cond["lte"]:
+                return False
+        elif kind != "match_all":
+            raise NotImplementedError(f"Query not supported: {kind}")
+
+    return True
+
+
+def _select(doc: Dict, fields) -> Dict:
+    """Filter document source like _source in a search"""
+    if fields is None or fields is True:
+        return doc
+
+    if fields is False:
+        return {}
+
+    if isinstance(fields, dict):
+        fields = fields.get("includes")
+
+        if fields is None:
+            return doc
+
+    out = {}
+
+    for field in fields:
+        val = _get_path(doc, field)
+
+        if val is None:
+            continue
+
+        curr = out
+        keys = field.split(".")
+
+        for key in keys[:-1]:
+            curr = curr.setdefault(key, {})
+
+        curr[keys[-1]] = val
+
+    return out
+
+
+class FakeSumo:
+    """Duck-typed SumoClient serving a synthetic case from memory
+
+    The case has surfaces and tables for every realization in two
+    iterations. Every request sleeps for `latency` seconds, and is
+    recorded in `requests` as a tuple of method, path and body.
+    """
+
+    def __init__(
+        self,
+        realizations: int = 10,
+        surfaces: int = 5,
+        tables: int = 2,
+        shape: Tuple[int, int] = (50, 40),
+        latency: float = 0.0,
+        seed: int = 0,
+    ) -> None:
+        """
+        Args:
+            realizations (int): number of realizations per iteration
+            surfaces (int): number of surface names per realization
+            tables (int): number of table names per realization
+            shape (Tuple[int, int]): surface grid shape (ncol, nrow)
+            latency (float): seconds to sleep per request
+            seed (int): seed of generated surface values
+        """
+        self.latency = latency
+        self.shape = shape
+        self.requests = []
+        self._rng = np.random.default_rng(seed)
+        self._docs = []
+        self._blobs = {}
+        self._pits = set()
+        self._build(realizations, surfaces, tables)
+
+    def _build(self, realizations: int, surfaces: int, tables: int):
+        self._docs.append(
+            {
+                "_id": CASE_UUID,
+                "class": "case",
+                "fmu": {
+                    "case": {"name": "bench_case", "user": {"id": "bench"}}
+                },
+                "_sumo": {"status": "keep"},
+                "access": {"asset": {"name": "Drogon"}},
+                "masterdata": {
+                    "smda": {"field": [{"identifier": "DROGON"}]}
+                },
+            }
+        )
+
+        for real in range(realizations):
+            for iteration in ITERATIONS:
+                for i in range(surfaces):
+                    self._add_surface(real, iteration, f"surface_{i}")
+
+                for i in range(tables):
+                    spec = {"columns": [f"COL_{c}" for c in range(20)]}
+                    blob = b"COL_0,COL_1\n1,2\n"
+                    self._add_child(
+                        "table", real, iteration, f"table_{i}", spec, blob
+                    )
+
+    def _add_child(
+        self,
+        cls: str,
+        real: int,
+        iteration: str,
+        name: str,
+        spec: Dict,
+        blob: bytes,
+    ) -> Dict:
+        uuid = str(uuidlib.UUID(int=len(self._docs) + 1, version=4))
+        doc = {
+            "_id": uuid,
+            "class": cls,
+            "data": {
+                "name": name,
+                "tagname": "ds_extract",
+                "format": "irap_binary" if cls == "surface" else "csv",
+                "spec": spec,
+            },
+            "fmu": {
+                "case": {"name": "bench_case", "user": {"id": "bench"}},
+                "iteration": {"id": int(iteration[-1]), "name": iteration},
+                "realization": {"id": real},
+                "context": {"stage": "realization"},
+            },
+            "_sumo": {
+                "parent_object": CASE_UUID,
+                "status": "keep",
+                "blob_md5": hashlib.md5(blob).hexdigest(),
+            },
+            "file": {"relative_path": f"{name}--{real}"},
+        }
+        self._docs.append(doc)
+        self._blobs[uuid] = blob
+
+        return doc
+
+    def _add_surface(self, real: int, iteration: str, name: str):
+        ncol, nrow = self.shape
+        values = self._rng.normal(1000.0 + real, 10.0, size=(ncol, nrow))
+        # undefined columns differing between realizations
+        values = np.ma.array(values)
+        values[: real % 4] = np.ma.masked
+        surface = xtgeo.RegularSurface(
+            ncol=ncol, nrow=nrow, xinc=25.0, yinc=25.0, values=values
+        )
+        spec = {
+            "ncol": ncol,
+            "nrow": nrow,
+            "xinc": 25.0,
+            "yinc": 25.0,
+            "xori": 0.0,
+            "yori": 0.0,
+            "rotation": 0.0,
+            "undef": 1.0e30,
+        }
+        doc = self._add_child(
+            "surface", real, iteration, name, spec, _to_irap(surface)
+        )
+        doc["data"]["time"] = {"t0": {"value": "2018-01-01T00:00:00"}}
+
+    def _wait(self):
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+    def get(self, path: str, params: Dict = None):
+        """Serve GET request"""
+        self.requests.append(("GET", path, params))
+        self._wait()
+
+        if path.startswith("/objects('"):
+            uuid = path[len("/objects('") :].split("'")[0]
+
+            if path.endswith("/blob/authuri"):
+                return f"https://fake/{uuid}?sas=1".encode("utf-8")
+
+            return self._blobs[uuid]
+
+        if path == "/userpermissions":
+            return {"Drogon": "read"}
+
+        raise NotImplementedError(f"Path not supported: {path}")
+
+    def post(self, path: str, json: Dict = None, params: Dict = None):
+        """Serve POST request"""
+        self.requests.append(("POST", path, json))
+        self._wait()
+
+        if path == "/search":
+            return FakeResponse(_dumps(self._search(json)))
+
+        if path == "/pit":
+            pit_id = f"pit-{len(self._pits)}"
+            self._pits.add(pit_id)
+            return FakeResponse(_dumps({"id": pit_id}))
+
+        if path == "/aggregate":
+            return FakeResponse(self._aggregate(json))
+
+        raise NotImplementedError(f"Path not supported: {path}")
+
+    def delete(self, path: str, params: Dict = None):
+        """Serve DELETE request"""
+        self.requests.append(("DELETE", path, params))
+        self._pits.discard((params or {}).get("id"))
+
+        return FakeResponse(b"{}")
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        """Serve HTTP request sent through an httpx mock transport"""
+        path = request.url.path[len(httpx.URL(BASE_URL).path) :]
+        params = dict(request.url.params) or None
+
+        try:
+            if request.method == "POST":
+                body = json.loads(request.content) if request.content else None
+                res = self.post(path, json=body, params=params)
+            elif request.method == "GET":
+                res = self.get(path, params=params)
+            else:
+                res = self.delete(path, params=params)
+        except NotImplementedError as error:
+            return httpx.Response(404, text=str(error))
+
+        if isinstance(res, (dict, list)):
+            return httpx.Response(200, json=res)
+
+        if isinstance(res, bytes):
+            return httpx.Response(200, content=res)
+
+        return httpx.Response(res.status_code, content=res.content)
+
+    def _search(self, body: Dict) -> Dict:
+        docs = [doc for doc in self._docs if _match(doc, body.get("query"))]
+        sliced = body.get("slice")
+
+        if sliced is not None:
+            docs = [
+                doc
+                for i, doc in enumerate(docs)
+                if i % sliced["max"] == sliced["id"]
+            ]
+
+        # sorted by _doc descending, with the position as sort value
+        ordered = [(len(docs) - i, doc) for i, doc in enumerate(docs)]
+        after = body.get("search_after")
+
+        if after is not None:
+            ordered = [(key, doc) for key, doc in ordered if key < after[0]]
+
+        start = body.get("from", 0)
+        page = ordered[start : start + body.get("size", 10)]
+        res = {
+            "hits": {
+                "total": {"value": len(docs)},
+                "hits": [
+                    {
+                        "_id": doc["_id"],
+                        "_source": _select(doc, body.get("_source")),
+                        "sort": [key],
+                    }
+                    for key, doc in page
+                ],
+            }
+        }
+
+        if "pit" in body:
+            res["pit_id"] = body["pit"]["id"]
+
+        if "aggs" in body:
+            res["aggregations"] = {
+                name: self._aggregation(agg, docs)
+                for name, agg in body["aggs"].items()
+            }
+
+        return res
+
+    def _aggregation(self, agg: Dict, docs: List[Dict]) -> Dict:
+        if "terms" in agg:
+            return self._terms(agg, docs)
+
+        if "composite" in agg:
+            return self._composite(agg["composite"], docs)
+
+        raise NotImplementedError(f"Aggregation not supported: {agg}")
+
+    def _terms(self, agg: Dict, docs: List[Dict]) -> Dict:
+        groups = {}
+
+        for doc in docs:
+            for val in _values(doc, agg["terms"]["field"]):
+                groups.setdefault(val, []).append(doc)
+
+        keys = sorted(groups, key=lambda key: -len(groups[key]))
+        buckets = []
+
+        for key in keys[: agg["terms"].get("size", 10)]:
+            bucket = {"key": key, "doc_count": len(groups[key])}
+
+            if isinstance(key, str) and key[:4].isdigit():
+                bucket["key_as_string"] = key
+
+            for name, sub in agg.get("aggs", {}).items():
+                bucket[name] = self._aggregation(sub, groups[key])
+
+            buckets.append(bucket)
+
+        return {"buckets": buckets}
+
+    @staticmethod
+    def _composite(agg: Dict, docs: List[Dict]) -> Dict:
+        sources = []
+
+        for source in agg["sources"]:
+            ((name, spec),) = source.items()
+            terms = spec["terms"]
+            sources.append(
+                (name, terms["field"], terms.get("missing_bucket", False))
+            )
+
+        counts = {}
+
+        for doc in docs:
+            combos = [()]
+
+            for _, field, missing_bucket in sources:
+                vals = _values(doc, field)
+
+                if not vals and missing_bucket:
+                    vals = [None]
+
+                combos = [combo + (val,) for combo in combos for val in vals]
+
+            for combo in combos:
+                counts[combo] = counts.get(combo, 0) + 1
+
+        def order(key):
+            return tuple((val is not None, val) for val in key)
+
+        keys = sorted(counts, key=order)
+        after = agg.get("after")
+
+        if after is not None:
+            after_key = order(tuple(after[name] for name, _, _ in sources))
+            keys = [key for key in keys if order(key) > after_key]
+
+        buckets = [
+            {
+                "key": {name: val for (name, _, _), val in zip(sources, key)},
+                "doc_count": counts[key],
+            }
+            for key in keys[: agg.get("size", 10)]
+        ]
+        res = {"buckets": buckets}
+
+        if buckets:
+            res["after_key"] = buckets[-1]["key"]
+
+        return res
+
+    def _aggregate(self, body: Dict) -> bytes:
+        operations = body["operation"]
+        surfaces = [
+            xtgeo.surface_from_file(io.BytesIO(self._blobs[uuid]))
+            for uuid in body["object_ids"]
+        ]
+        stack = np.ma.stack([surface.values for surface in surfaces])
+        blobs = []
+
+        for operation in operations:
+            result = surfaces[0].copy()
+            result.values = OPERATIONS[operation](stack)
+            blobs.append(_to_irap(result))
+
+        if len(blobs) == 1:
+            return blobs[0]
+
+        buf = io.BytesIO()
+
+        with zipfile.ZipFile(buf, "w") as archive:
+            for operation, blob in zip(operations, blobs):
+                archive.writestr(operation, blob)
+
+        return buf.getvalue()
+
+
+def _to_irap(surface: xtgeo.RegularSurface) -> bytes:
+    buf = io.BytesIO()
+    surface.to_file(buf, fformat="irap_binary")
+
+    return buf.getvalue()
+
+
+def wrapper_client(fake: FakeSumo) -> SumoClient:
+    """Make a SumoClient sending its requests to fake
+
+    The client is authenticated with an unsigned access token for the
+    fake environment, and sends requests through an httpx mock transport
+    handled by fake.
+    """
+    # the wrapper downloads this once per process, outside its http client
+    sumo_client.well_known = WELL_KNOWN
+    resource_id = WELL_KNOWN["envs"][ENV]["resource_id"]
+    token = jwt.encode(
+        {"aud": resource_id, "oid": "bench", "exp": time.time() + 86400},
+        "fake-key-for-benchmarks-only-0000",
+        algorithm="HS256",
+    )
+    http_client = httpx.Client(transport=httpx.MockTransport(fake.handle))
+
+    return SumoClient(ENV, token=token, http_client=http_client)
@@ -41,7 +41,11 @@ REQUIREMENTS = (
 TEST_REQUIREMENTS = parse_requirements("requirements/requirements_test.txt")
 DOCS_REQUIREMENTS = parse_requirements("requirements/requirements_docs.txt")
 SETUP_REQUIREMENTS = parse_requirements("requirements/requirements_setup.txt")
-EXTRAS_REQUIRE = {"tests": TEST_REQUIREMENTS, "docs": DOCS_REQUIREMENTS}
+EXTRAS_REQUIRE = {
+    "tests": TEST_REQUIREMENTS,
+    "docs": DOCS_REQUIREMENTS,
+    "dask": ["dask[array]"],
+}
 
 setup(
     name="fmu-sumo",
@@ -2,4 +2,11 @@
 
 from fmu.sumo.explorer.explorer import Explorer
 from fmu.sumo.explorer.timefilter import TimeType, TimeFilter
+from fmu.sumo.explorer.cache import QueryCache, BlobCache, AggregationCache
+from fmu.sumo.explorer.instrumentation import (
+    RequestEvent,
+    LatencyAggregator,
+    JsonLinesExporter,
+)
+from fmu.sumo.explorer.cassette import RecordingClient, ReplayClient
 from fmu.sumo.explorer.objects.table_aggregated import AggregatedTable
@@ -0,0 +1,264 @@
+"""Module containing wrapper for the Sumo client used by the Explorer"""
+from typing import Dict, List
+import hashlib
+import logging
+import time
+import jwt
+from sumo.wrapper import SumoClient
+from fmu.sumo.explorer.cache import (
+    QueryCache,
+    BlobCache,
+    AggregationCache,
+    _fingerprint,
+)
+from fmu.sumo.explorer.instrumentation import RequestEvent, _caller
+
+logger = logging.getLogger(__name__)
+
+
+class _ParsedResponse:
+    """Response with content already parsed as JSON
+
+    Instrumented search responses are parsed to count the hits, and the
+    parsed content is handed on instead of parsing it again.
+    """
+
+    __slots__ = ("_response", "_data")
+
+    def __init__(self, response, data: Dict) -> None:
+        self._response = response
+        self._data = data
+
+    def json(self) -> Dict:
+        """Get the parsed content"""
+        return self._data
+
+    def __getattr__(self, name: str):
+        return getattr(self._response, name)
+
+
+def _principal(sumo: SumoClient) -> str:
+    """Get the user a client authenticates as, or None if unknown
+
+    The user is the object id of the access token, or a hash of the token
+    if it is not a JWT.
+    """
+    auth = getattr(sumo, "auth", None)
+
+    try:
+        token = auth.get_token() if auth is not None else None
+    except Exception:  # pylint: disable=broad-except
+        return None
+
+    if not token:
+        return None
+
+    try:
+        claims = jwt.decode(token, options={"verify_signature": False})
+    except jwt.InvalidTokenError:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    return claims.get("oid") or claims.get("sub") or claims.get("upn")
+
+
+class ExplorerClient:
+    """Wrapper around SumoClient adding client side services
+
+    Requests are passed on to the wrapped client, except for search
+    queries answered by the query cache. Requests without a query, such
+    as keep-alive requests for a point in time, are always sent. Objects
+    and collections look up the blob cache and the aggregation cache on
+    the client they were created with.
+
+    Search responses are cached in the scope of the environment and the
+    user of the wrapped client, so a query cache can be shared between
+    clients of different environments or users.
+
+    With instrumentation hooks, every request is timed and recorded as a
+    `RequestEvent`, which is passed to the `record` method of each hook.
+    Errors raised by a hook are logged, and do not fail the request.
+    """
+
+    def __init__(
+        self,
+        sumo: SumoClient,
+        query_cache: QueryCache = None,
+        blob_cache: BlobCache = None,
+        instrumentation: List = None,
+        aggregation_cache: AggregationCache = None,
+    ):
+        """
+        Args:
+            sumo (SumoClient): client to wrap
+            query_cache (QueryCache): cache for search responses
+            blob_cache (BlobCache): cache for object blobs
+            instrumentation (List): hooks recording requests
+            aggregation_cache (AggregationCache): cache for aggregations
+        """
+        self._sumo = sumo
+        self._query_cache = query_cache
+        self._blob_cache = blob_cache
+        self._hooks = list(instrumentation or [])
+        self._aggregation_cache = aggregation_cache
+        self._scope = None
+
+    @property
+    def query_cache(self) -> QueryCache:
+        """Cache for search responses"""
+        return self._query_cache
+
+    @property
+    def blob_cache(self) -> BlobCache:
+        """Cache for object blobs"""
+        return self._blob_cache
+
+    @property
+    def aggregation_cache(self) -> AggregationCache:
+        """Cache for aggregated surfaces"""
+        return self._aggregation_cache
+
+    def post(self, path: str, json: Dict = None, **kwargs):
+        """Send POST request, answering search queries from the cache
+
+        Args:
+            path (str): request path
+            json (dict): request body
+
+        Returns:
+            The response
+        """
+        cacheable = (
+            self._query_cache is not None
+            and path == "/search"
+            and not kwargs
+            and "query" in (json or {})
+        )
+
+        if cacheable:
+            scope = self._cache_scope()
+            res = self._query_cache.get(path, json, scope)
+
+            if res is not None:
+                if self._hooks:
+                    res = self._record("POST", path, json, "hit", 0.0, res)
+
+                return res
+
+        start = time.perf_counter()
+        res = self._sumo.post(path, json=json, **kwargs)
+        latency = time.perf_counter() - start
+
+        if cacheable:
+            self._query_cache.put(path, json, res, scope)
+
+        if self._hooks:
+            cache = "miss" if cacheable else None
+            res = self._record("POST", path, json, cache, latency, res)
+
+        return res
+
+    def _cache_scope(self) -> str:
+        """Get the environment and user scoping cached search responses"""
+        if self._scope is None:
+            base_url = getattr(self._sumo, "base_url", None)
+            self._scope = f"{base_url} {_principal(self._sumo)}"
+
+        return self._scope
+
+    def get(self, path: str, **kwargs):
+        """Send GET request
+
+        Args:
+            path (str): request path
+
+        Returns:
+            The response
+        """
+        start = time.perf_counter()
+        res = self._sumo.get(path, **kwargs)
+
+        if self._hooks:
+            latency = time.perf_counter() - start
+            self._record("GET", path, None, None, latency, res)
+
+        return res
+
+    def delete(self, path: str, **kwargs):
+        """Send DELETE request
+
+        Args:
+            path (str): request path
+
+        Returns:
+            The response
+        """
+        start = time.perf_counter()
+        res = self._sumo.delete(path, **kwargs)
+
+        if self._hooks:
+            latency = time.perf_counter() - start
+            self._record("DELETE", path, None, None, latency, res)
+
+        return res
+
+    def __getattr__(self, name: str):
+        return getattr(self._sumo, name)
+
+    def _record(
+        self,
+        method: str,
+        path: str,
+        json: Dict,
+        cache: str,
+        latency: float,
+        res,
+    ):
+        """Pass a request event to the hooks
+
+        Args:
+            method (str): HTTP method
+            path (str): request path
+            json (dict): request body
+            cache (str): query cache hit or miss, or None
+            latency (float): seconds spent on the request
+            res: the response
+
+        Returns:
+            The response, with search responses parsed
+        """
+        content = getattr(res, "content", res)
+        size = len(content) if isinstance(content, bytes) else None
+        hits = None
+
+        if path == "/search":
+            res = _ParsedResponse(res, res.json())
+            hits = len(res.json().get("hits", {}).get("hits", []))
+
+        fingerprint = None
+
+        if json is not None:
+            # the point in time id changes between otherwise equal queries
+            shape = {key: val for key, val in json.items() if key != "pit"}
+            fingerprint = _fingerprint(path, shape)
+
+        operation, call_site = _caller()
+        event = RequestEvent(
+            time.time() - latency,
+            method,
+            path,
+            fingerprint,
+            latency,
+            size,
+            hits,
+            cache,
+            operation,
+            call_site,
+        )
+
+        for hook in self._hooks:
+            try:
+                hook.record(event)
+            except Exception:
+                logger.exception("Instrumentation hook %r failed", hook)
+
+        return res
@@ -0,0 +1,156 @@
+"""Module containing functions for the IRAP binary surface format
+
+An IRAP binary surface is a sequence of Fortran records: a header of
+three records followed by records of big-endian float32 values. Every
+record is wrapped by 4-byte big-endian markers holding its length.
+"""
+from typing import Dict, Tuple, Union
+from io import BytesIO
+import struct
+import numpy as np
+import xtgeo
+
+_HEADER = struct.Struct(">3i6f3i3f10i")
+
+_MARKER = struct.Struct(">i")
+
+# values at or above this are undefined, as in xtgeo.UNDEF_MAP_IRAPB
+_UNDEF_MAP_IRAPB = 1e30
+
+# attributes compared by RegularSurface.compare_topology(strict=False)
+_GRID = ("ncol", "nrow", "xori", "yori", "xinc", "yinc", "rotation")
+
+
+def _parse_irap(buf: Union[bytes, memoryview]) -> Tuple[Dict, np.ndarray]:
+    """Parse IRAP binary surface with one record per row of values
+
+    Returns:
+        Tuple[Dict, np.ndarray]: the geometry of the surface, and a
+        read-only view of its values in the buffer, shape (ncol, nrow),
+        or None if the buffer has another layout
+    """
+    if len(buf) < _HEADER.size:
+        return None
+
+    header = _HEADER.unpack_from(buf)
+
+    if header[0] != 32 or header[1] != -996:
+        return None
+
+    nrow, ncol = header[2], header[11]
+
+    if len(buf) != _HEADER.size + nrow * (ncol * 4 + 2 * _MARKER.size):
+        return None
+
+    block = np.frombuffer(buf, dtype=">f4", offset=_HEADER.size)
+    block = block.reshape(nrow, ncol + 2)
+    markers = block.view(">i4")[:, [0, -1]]
+
+    if not (markers == ncol * 4).all():
+        return None
+
+    yinc = header[8]
+    geometry = {
+        "ncol": ncol,
+        "nrow": nrow,
+        "xori": header[3],
+        "yori": header[5],
+        "xinc": header[7],
+        "yinc": abs(yinc),
+        "yflip": -1 if yinc < 0 else 1,
+        "rotation": header[12],
+    }
+
+    return geometry, block[:, 1:-1].T
+
+
+def _undefined(values: np.ndarray) -> np.ndarray:
+    """Get mask of undefined values
+
+    As when xtgeo reads IRAP binary, values at or above 1e30 and NaN are
+    undefined, and every other value is defined.
+    """
+    return (values >= _UNDEF_MAP_IRAPB) | np.isnan(values)
+
+
+def read_irap(buf: Union[bytes, memoryview]) -> xtgeo.RegularSurface:
+    """Decode IRAP binary surface with one record per row of values
+
+    The values are read in place with np.frombuffer, and copied once into
+    the array of the surface. This is the layout written by xtgeo and
+    RMS.
+
+    Args:
+        buf (bytes or memoryview): the surface
+
+    Returns:
+        RegularSurface: the surface, or None if the buffer has another
+        layout
+    """
+    parsed = _parse_irap(buf)
+
+    if parsed is None:
+        return None
+
+    geometry, values = parsed
+    values = values.astype(np.float64, order="C")
+
+    return xtgeo.RegularSurface(
+        values=np.ma.MaskedArray(values, mask=_undefined(values)),
+        **geometry,
+    )
+
+
+def surface_from_blob(blob: Union[bytes, memoryview]) -> xtgeo.RegularSurface:
+    """Decode surface blob, using xtgeo for other layouts and formats
+
+    Args:
+        blob (bytes or memoryview): the surface
+
+    Returns:
+        RegularSurface: the surface
+    """
+    surface = read_irap(blob)
+
+    if surface is None:
+        surface = xtgeo.surface_from_file(BytesIO(blob))
+
+    return surface
+
+
+def read_values_into(blob: Union[bytes, memoryview], out: np.ndarray) -> Tuple:
+    """Decode the values of a surface blob into an array
+
+    Undefined values are written as NaN. No RegularSurface is created for
+    IRAP binary surfaces, so this is cheaper than `surface_from_blob` when
+    only the values are needed.
+
+    Args:
+        blob (bytes or memoryview): the surface
+        out (np.ndarray): float array of shape (ncol, nrow)
+
+    Returns:
+        Tuple: ncol, nrow, xori, yori, xinc, yinc and rotation of the
+        surface, which are equal for surfaces on the same grid
+
+    Raises:
+        ValueError: if the surface does not have the shape of the array
+    """
+    parsed = _parse_irap(blob)
+
+    if parsed is None:
+        surface = xtgeo.surface_from_file(BytesIO(blob))
+        geometry = {key: getattr(surface, key) for key in _GRID}
+        values = surface.values.data
+        undefined = np.ma.getmaskarray(surface.values)
+    else:
+        geometry, values = parsed
+        undefined = _undefined(values)
+
+    if values.shape != out.shape:
+        raise ValueError("Surfaces are not on the same grid")
+
+    np.copyto(out, values)
+    np.copyto(out, np.nan, where=undefined)
+
+    return tuple(geometry[key] for key in _GRID)
@@ -0,0 +1,123 @@
+"""Module containing classes for reading ahead of iterators"""
+from typing import Iterator, List
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+_DONE = object()
+
+
+class ReadAhead:
+    """Iterator pulling items from a source iterator in the background
+
+    A single worker thread advances the source, keeping up to `depth`
+    items requested ahead of the item currently being consumed. Items
+    are returned in the same order as the source produces them.
+    """
+
+    def __init__(self, source: Iterator, depth: int = 1) -> None:
+        """
+        Args:
+            source (Iterator): iterator to read ahead of
+            depth (int): number of items to request ahead of the consumer
+        """
+        self._source = source
+        self._depth = depth
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._pending = deque()
+        self._done = False
+
+    def __iter__(self) -> "ReadAhead":
+        return self
+
+    def __next__(self):
+        if self._done:
+            raise StopIteration
+
+        if len(self._pending) == 0:
+            self._submit()
+
+        future = self._pending.popleft()
+
+        while len(self._pending) < self._depth:
+            self._submit()
+
+        try:
+            item = future.result()
+        except BaseException:
+            self.close()
+            raise
+
+        if item is _DONE:
+            self.close()
+            raise StopIteration
+
+        return item
+
+    def _submit(self) -> None:
+        self._pending.append(
+            self._executor.submit(next, self._source, _DONE)
+        )
+
+    def close(self) -> None:
+        """Stop reading ahead and discard items not yet consumed"""
+        self._done = True
+
+        for future in self._pending:
+            future.cancel()
+
+        self._pending.clear()
+        self._executor.shutdown(wait=False)
+
+
+class Interleave:
+    """Iterator pulling items from several source iterators concurrently
+
+    Every source is advanced by its own worker thread, one item ahead of
+    the consumer. Items are returned in the order they become available,
+    so the order between sources is not deterministic.
+    """
+
+    def __init__(self, sources: List[Iterator]) -> None:
+        """
+        Args:
+            sources (List[Iterator]): iterators to read from
+        """
+        self._executor = ThreadPoolExecutor(max_workers=max(len(sources), 1))
+        self._pending = {}
+
+        for source in sources:
+            self._submit(source)
+
+    def __iter__(self) -> "Interleave":
+        return self
+
+    def __next__(self):
+        while len(self._pending) > 0:
+            done, _ = wait(self._pending, return_when=FIRST_COMPLETED)
+            future = done.pop()
+            source = self._pending.pop(future)
+
+            try:
+                item = future.result()
+            except BaseException:
+                self.close()
+                raise
+
+            if item is not _DONE:
+                self._submit(source)
+                return item
+
+        self.close()
+        raise StopIteration
+
+    def _submit(self, source: Iterator) -> None:
+        future = self._executor.submit(next, source, _DONE)
+        self._pending[future] = source
+
+    def close(self) -> None:
+        """Stop reading and discard items not yet consumed"""
+        for future in self._pending:
+            future.cancel()
+
+        self._pending.clear()
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,144 @@
+"""Module containing local computation of ensemble statistics
+
+Values of the realizations are float arrays of equal shape, with NaN for
+undefined values. Statistics are masked arrays, masked where no
+realization has a defined value. The standard deviation is the population
+standard deviation, and pXX is the XXth percentile of the defined values,
+interpolated linearly between the closest realizations as by
+numpy.nanpercentile. test_surfaces_aggregate_local checks every
+operation against Sumo.
+"""
+from typing import Dict, List
+import warnings
+import numpy as np
+
+OPERATIONS = ("mean", "min", "max", "std", "p10", "p50", "p90")
+
+_PERCENTILES = {"p10": 10, "p50": 50, "p90": 90}
+
+# bytes of stacked values per block of cells, bounding the temporary
+# arrays made when computing statistics
+_BLOCK_BYTES = 64 * 1024**2
+
+
+def check_operations(operations: List[str]) -> None:
+    """Check that operations are supported
+
+    Raises:
+        ValueError: if an operation is not supported
+    """
+    for operation in operations:
+        if operation not in OPERATIONS:
+            raise ValueError(f"Invalid operation: {operation}")
+
+
+def stack_statistics(
+    stack: np.ndarray, operations: List[str]
+) -> Dict[str, np.ma.MaskedArray]:
+    """Compute statistics over the first axis of stacked realizations
+
+    The nan-aware functions of numpy copy their input, so the statistics
+    are computed a block of cells at a time, keeping the temporary memory
+    within a small multiple of `_BLOCK_BYTES` regardless of the size of
+    the stack.
+
+    Args:
+        stack (np.ndarray): values, shape (realizations, ...)
+        operations (List[str]): statistics to compute
+
+    Returns:
+        Dict: statistic for each operation
+    """
+    flat = stack.reshape(stack.shape[0], -1)
+    block_size = max(_BLOCK_BYTES // (max(flat.shape[0], 1) * 8), 1)
+    result = {op: np.empty(flat.shape[1]) for op in operations}
+    percentiles = [op for op in operations if op in _PERCENTILES]
+
+    with warnings.catch_warnings():
+        # cells without defined values give NaN, and are masked
+        warnings.simplefilter("ignore", RuntimeWarning)
+
+        for start in range(0, flat.shape[1], block_size):
+            cells = slice(start, start + block_size)
+            block = flat[:, cells]
+
+            for operation in operations:
+                if operation == "mean":
+                    result[operation][cells] = np.nanmean(block, axis=0)
+                elif operation == "min":
+                    result[operation][cells] = np.nanmin(block, axis=0)
+                elif operation == "max":
+                    result[operation][cells] = np.nanmax(block, axis=0)
+                elif operation == "std":
+                    result[operation][cells] = np.nanstd(block, axis=0)
+
+            if percentiles:
+                values = np.nanpercentile(
+                    block, [_PERCENTILES[op] for op in percentiles], axis=0
+                )
+
+                for operation, value in zip(percentiles, values):
+                    result[operation][cells] = value
+
+    return {
+        operation: np.ma.masked_invalid(values.reshape(stack.shape[1:]))
+        for operation, values in result.items()
+    }
+
+
+class StreamingStatistics:
+    """Mean, standard deviation, minimum and maximum of realizations
+    added one at a time
+
+    The mean and standard deviation are updated with Welford's algorithm,
+    so memory use does not depend on the number of realizations.
+    """
+
+    def __init__(self, shape: tuple):
+        """
+        Args:
+            shape (tuple): shape of the values of each realization
+        """
+        self._count = np.zeros(shape, dtype=np.int64)
+        self._mean = np.zeros(shape)
+        self._m2 = np.zeros(shape)
+        self._min = np.full(shape, np.inf)
+        self._max = np.full(shape, -np.inf)
+
+    def add(self, values: np.ndarray) -> None:
+        """Add the values of a realization
+
+        Args:
+            values (np.ndarray): values, with NaN for undefined values
+        """
+        valid = ~np.isnan(values)
+        values = np.where(valid, values, 0.0)
+
+        self._count += valid
+        delta = np.where(valid, values - self._mean, 0.0)
+        self._mean += delta / np.maximum(self._count, 1)
+        self._m2 += np.where(valid, delta * (values - self._mean), 0.0)
+        np.minimum(self._min, np.where(valid, values, np.inf), out=self._min)
+        np.maximum(self._max, np.where(valid, values, -np.inf), out=self._max)
+
+    def result(self, operation: str) -> np.ma.MaskedArray:
+        """Get statistic
+
+        Args:
+            operation (str): mean, min, max or std
+
+        Returns:
+            np.ma.MaskedArray: the statistic
+        """
+        if operation == "mean":
+            values = self._mean
+        elif operation == "min":
+            values = self._min
+        elif operation == "max":
+            values = self._max
+        elif operation == "std":
+            values = np.sqrt(self._m2 / np.maximum(self._count, 1))
+        else:
+            raise ValueError(f"Not available when streaming: {operation}")
+
+        return np.ma.masked_where(self._count == 0, values)
@@ -1,5 +1,6 @@
 """Module containing utility class"""
-from typing import List, Dict
+from typing import List, Dict, Iterator
+from concurrent.futures import ThreadPoolExecutor
 import json
 from sumo.wrapper import SumoClient
 
@@ -23,22 +24,188 @@ class Utils:
             - query (List[Dict] or None): filter options
             - sort (List or None): sorting options
 
+        Returns:
+            A List of unique values for a given field
+        """
+        return list(self.iterate_buckets(field, query, sort))
+
+    def iterate_buckets(
+        self,
+        field: str,
+        query: Dict,
+        sort: List = None,
+    ) -> Iterator[Dict]:
+        """Iterate over buckets of unique values for a field
+
+        Buckets are ordered by value, and paged through with a composite
+        aggregation, so the number of unique values is not limited.
+
+        Arguments:
+            - field (str): a field in the metadata
+            - query (List[Dict] or None): filter options
+            - sort (List or None): sorting options
+
+        Returns:
+            Iterator over buckets with `key` and `doc_count`
+        """
+        for bucket in self.iterate_composite_buckets([field], query, sort):
+            yield {
+                "key": bucket["key"][field],
+                "doc_count": bucket["doc_count"],
+            }
+
+    def iterate_composite_buckets(
+        self,
+        fields: List[str],
+        query: Dict,
+        sort: List = None,
+        missing_bucket: bool = False,
+        size: int = 1000,
+    ) -> Iterator[Dict]:
+        """Iterate over buckets of unique combinations of field values
+
+        Each bucket has a `key` dictionary with a value for every field,
+        and a `doc_count`. Buckets are fetched `size` at a time.
+
+        Arguments:
+            - fields (List[str]): fields in the metadata
+            - query (List[Dict] or None): filter options
+            - sort (List or None): sorting options
+            - missing_bucket (bool): include documents missing a field,
+              with None as value
+            - size (int): number of buckets per request
+
+        Returns:
+            Iterator over composite buckets
+        """
+        sources = [
+            {field: {"terms": {"field": field, "missing_bucket": True}}}
+            if missing_bucket
+            else {field: {"terms": {"field": field}}}
+            for field in fields
+        ]
+        after = None
+
+        while True:
+            composite = {"size": size, "sources": sources}
+
+            if after is not None:
+                composite["after"] = after
+
+            query_object = {
+                "size": 0,
+                "aggs": {"values": {"composite": composite}},
+                "query": query,
+            }
+
+            if sort is not None:
+                query_object["sort"] = sort
+
+            res = self._sumo.post("/search", json=query_object)
+            aggregation = res.json()["aggregations"]["values"]
+            buckets = aggregation["buckets"]
+
+            yield from buckets
+
+            after = aggregation.get("after_key")
+
+            if len(buckets) < size or after is None:
+                return
+
+    def get_facet_buckets(
+        self,
+        fields: List[str],
+        query: Dict,
+        size: int = 1000,
+    ) -> Dict[str, List[Dict]]:
+        """Get buckets of unique values for several fields at once
+
+        All fields are aggregated in a single request, with one composite
+        aggregation per field. Fields with more than `size` unique values
+        are paged through with follow-up requests for those fields only.
+
+        Arguments:
+            - fields (List[str]): fields in the metadata
+            - query (List[Dict] or None): filter options
+            - size (int): number of buckets per field and request
+
+        Returns:
+            Dict mapping each field to buckets with `key` and `doc_count`
+        """
+        buckets = {field: [] for field in fields}
+        after = {}
+        remaining = list(fields)
+
+        while len(remaining) > 0:
+            aggs = {}
+
+            for field in remaining:
+                composite = {
+                    "size": size,
+                    "sources": [{field: {"terms": {"field": field}}}],
+                }
+
+                if field in after:
+                    composite["after"] = after[field]
+
+                aggs[field] = {"composite": composite}
+
+            res = self._sumo.post(
+                "/search", json={"size": 0, "aggs": aggs, "query": query}
+            )
+            aggregations = res.json()["aggregations"]
+            unfinished = []
+
+            for field in remaining:
+                aggregation = aggregations[field]
+
+                for bucket in aggregation["buckets"]:
+                    buckets[field].append(
+                        {
+                            "key": bucket["key"][field],
+                            "doc_count": bucket["doc_count"],
+                        }
+                    )
+
+                if (
+                    len(aggregation["buckets"]) == size
+                    and "after_key" in aggregation
+                ):
+                    after[field] = aggregation["after_key"]
+                    unfinished.append(field)
+
+            remaining = unfinished
+
+        return buckets
+
+    def get_terms_buckets(
+        self,
+        field: str,
+        query: Dict,
+        size: int = 2000,
+    ) -> List[Dict]:
+        """Get a List of buckets from a single terms aggregation
+
+        Unlike composite buckets, these include `key_as_string` for date
+        fields, but at most `size` buckets are returned.
+
+        Arguments:
+            - field (str): a field in the metadata
+            - query (List[Dict] or None): filter options
+            - size (int): maximum number of buckets
+
         Returns:
             A List of unique values for a given field
         """
         query = {
             "size": 0,
-            "aggs": {f"{field}": {"terms": {"field": field, "size": 2000}}},
+            "aggs": {f"{field}": {"terms": {"field": field, "size": size}}},
             "query": query,
         }
 
-        if sort is not None:
-            query["sort"] = sort
-
         res = self._sumo.post("/search", json=query)
-        buckets = res.json()["aggregations"][field]["buckets"]
 
-        return buckets
+        return res.json()["aggregations"][field]["buckets"]
 
     def get_objects(
         self,
@@ -92,6 +259,65 @@ class Utils:
 
         return hits[0]
 
+    def get_objects_by_uuids(
+        self,
+        uuids: List[str],
+        select: List[str] = None,
+        chunk_size: int = 500,
+        max_workers: int = 8,
+    ) -> List[Dict]:
+        """Get metadata objects by uuids
+
+        The uuids are split into chunks of `chunk_size`, each looked up
+        with a single terms query. The chunks are fetched concurrently.
+
+        Args:
+            uuids (List[str]): uuids of metadata objects
+            select (List[str]): list of metadata fields to return
+            chunk_size (int): number of uuids per request
+            max_workers (int): maximum number of concurrent requests
+
+        Returns:
+            List[Dict]: metadata objects, in the same order as `uuids`
+
+        Raises:
+            Exception: listing every uuid that was not found
+        """
+        unique = list(dict.fromkeys(uuids))
+        chunks = [
+            unique[i : i + chunk_size]
+            for i in range(0, len(unique), chunk_size)
+        ]
+
+        def get_chunk(chunk: List[str]) -> List[Dict]:
+            query = {"query": {"terms": {"_id": chunk}}, "size": len(chunk)}
+
+            if select is not None:
+                query["_source"] = select
+
+            res = self._sumo.post("/search", json=query)
+
+            return res.json()["hits"]["hits"]
+
+        if len(chunks) == 0:
+            return []
+
+        workers = min(len(chunks), max_workers)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            found = {
+                hit["_id"]: hit
+                for hits in executor.map(get_chunk, chunks)
+                for hit in hits
+            }
+
+        missing = [uuid for uuid in unique if uuid not in found]
+
+        if len(missing) > 0:
+            raise Exception(f"Documents not found: {', '.join(missing)}")
+
+        return [found[uuid] for uuid in uuids]
+
     def extend_query_object(self, old: Dict, new: Dict) -> Dict:
         """Extend query object
 
@@ -156,7 +382,9 @@ class Utils:
         for key in keys_vals:
             val = keys_vals[key]
             if val is not None:
-                items = [val] if not isinstance(val, list) else val
+                # copied, so later changes to the caller's list do not
+                # change the query
+                items = [val] if not isinstance(val, list) else list(val)
                 terms.append({"terms": {key: items}})
 
         return terms
@@ -0,0 +1,501 @@
+"""Module containing caches for responses from Sumo"""
+from typing import Dict, Any, List, Set, Tuple
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+
+def _fingerprint(path: str, query: Dict) -> str:
+    """Get a stable hash of a request path and query object"""
+    normalized = json.dumps(query, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(f"{path}:{normalized}".encode("utf-8")).hexdigest()
+
+
+class QueryCache:
+    """Cache for responses to search queries
+
+    Responses are kept for `ttl` seconds. Responses to queries against a
+    point in time snapshot do not expire, since the snapshot can not
+    change while it is alive, and are dropped when it is closed. When the
+    cached responses exceed `max_bytes`, the least recently used responses
+    are evicted.
+
+    The cache is thread safe, and can be shared between Explorer objects.
+    Responses are cached per scope, the Sumo environment and user of the
+    Explorer, so they are not shared between environments or users.
+
+    Example::
+
+        cache = QueryCache(ttl=600)
+        sumo = Explorer(cache=cache)
+
+        ...
+
+        print(cache.hits, cache.misses)
+    """
+
+    def __init__(self, ttl: float = 300, max_bytes: int = 64 * 1024**2):
+        """
+        Args:
+            ttl (float): number of seconds to keep responses
+            max_bytes (int): maximum total size of cached responses
+        """
+        self._ttl = ttl
+        self._max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def hits(self) -> int:
+        """Number of queries answered from the cache"""
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        """Number of queries not found in the cache"""
+        return self._misses
+
+    @property
+    def size(self) -> int:
+        """Total size of cached responses in bytes"""
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, path: str, query: Dict, scope: str = "") -> Any:
+        """Get cached response
+
+        Args:
+            path (str): request path
+            query (dict): query object
+            scope (str): environment and user sending the query
+
+        Returns:
+            The cached response, or None
+        """
+        key = _fingerprint(path, {"scope": scope, "query": query})
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None and entry[0] is not None:
+                if entry[0] < time.monotonic():
+                    self._evict(key)
+                    entry = None
+
+            if entry is None:
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+
+            return entry[1]
+
+    def put(
+        self, path: str, query: Dict, response: Any, scope: str = ""
+    ) -> None:
+        """Cache response
+
+        Args:
+            path (str): request path
+            query (dict): query object
+            response: response with `content`
+            scope (str): environment and user sending the query
+        """
+        size = len(response.content)
+
+        if size > self._max_bytes:
+            return
+
+        key = _fingerprint(path, {"scope": scope, "query": query})
+        pit_id = query.get("pit", {}).get("id")
+        expires = None if "pit" in query else time.monotonic() + self._ttl
+
+        with self._lock:
+            if key in self._entries:
+                self._evict(key)
+
+            self._entries[key] = (expires, response, size, pit_id)
+            self._size += size
+
+            while self._size > self._max_bytes:
+                self._evict(next(iter(self._entries)))
+
+    def discard_pit(self, pit_ids: Set[str]) -> None:
+        """Remove responses to queries against a closed point in time
+
+        Args:
+            pit_ids (Set[str]): ids the point in time has had
+        """
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if entry[3] is not None and entry[3] in pit_ids:
+                    self._evict(key)
+
+    def clear(self) -> None:
+        """Remove all cached responses"""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _evict(self, key: str) -> None:
+        size = self._entries.pop(key)[2]
+        self._size -= size
+
+
+class BlobCache:
+    """Persistent cache for object blobs
+
+    Blobs are stored as files in `directory`, named by a hash of their
+    key. Child objects use their uuid and the md5 checksum of the blob as
+    key, so a blob is never served after the object has changed.
+
+    Files are written to a temporary file and renamed into place, so
+    several processes can share the same directory. The size of the
+    directory is taken from a scan, plus the blobs written since. Since
+    other processes write to it as well, the directory is scanned again
+    once 5% of `max_bytes` has been written or a minute has passed since
+    the last scan. When the size exceeds `max_bytes`, the least recently
+    used blobs are removed until it is below 90% of `max_bytes`. The scan
+    also removes temporary files left for an hour by interrupted writes.
+
+    Example::
+
+        sumo = Explorer(blob_cache=BlobCache("/scratch/sumo_blobs"))
+    """
+
+    _SUFFIX = ".blob"
+
+    _TMP_SUFFIX = ".tmp"
+
+    # age in seconds of temporary files considered left by interrupted
+    # writes
+    _STALE_AGE = 3600
+
+    # fraction of max_bytes the blobs are evicted down to
+    _LOW_WATER = 0.9
+
+    # fraction of max_bytes written, and seconds passed, before the size
+    # of the directory is scanned again
+    _RESCAN_FRACTION = 0.05
+    _RESCAN_INTERVAL = 60.0
+
+    def __init__(self, directory: str, max_bytes: int = 10 * 1024**3):
+        """
+        Args:
+            directory (str): directory to store blobs in
+            max_bytes (int): maximum total size of cached blobs
+        """
+        os.makedirs(directory, exist_ok=True)
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+        self._size = None
+        self._written = 0
+        self._scanned = 0.0
+
+    @property
+    def directory(self) -> str:
+        """Directory blobs are stored in"""
+        return self._directory
+
+    @property
+    def hits(self) -> int:
+        """Number of blobs read from the cache"""
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        """Number of blobs not found in the cache"""
+        return self._misses
+
+    def get(self, key: str) -> bytes:
+        """Get cached blob
+
+        Args:
+            key (str): blob key
+
+        Returns:
+            The cached blob, or None
+        """
+        path = self._path(key)
+
+        try:
+            with open(path, "rb") as blob_file:
+                blob = blob_file.read()
+
+            # the modification time marks the blob as recently used
+            os.utime(path)
+        except FileNotFoundError:
+            self._misses += 1
+            return None
+
+        self._hits += 1
+
+        return blob
+
+    def put(self, key: str, blob: bytes) -> None:
+        """Cache blob
+
+        Args:
+            key (str): blob key
+            blob (bytes): blob content
+        """
+        if len(blob) > self._max_bytes:
+            return
+
+        path = self._path(key)
+        handle, tmp_path = tempfile.mkstemp(
+            dir=self._directory, suffix=self._TMP_SUFFIX
+        )
+
+        try:
+            with os.fdopen(handle, "wb") as tmp_file:
+                tmp_file.write(blob)
+
+            try:
+                replaced = os.stat(path).st_size
+            except FileNotFoundError:
+                replaced = 0
+
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+        with self._lock:
+            self._written += len(blob)
+            rescan = (
+                self._size is None
+                or self._written > self._RESCAN_FRACTION * self._max_bytes
+                or time.monotonic() - self._scanned > self._RESCAN_INTERVAL
+            )
+
+            if rescan:
+                self._size = self._rescan()
+            else:
+                self._size += len(blob) - replaced
+
+            if self._size > self._max_bytes:
+                self._size = self._rescan(self._LOW_WATER * self._max_bytes)
+
+    def clear(self) -> None:
+        """Remove all cached blobs"""
+        with self._lock:
+            self._size = self._rescan(0)
+
+    def _path(self, key: str) -> str:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self._directory, digest + self._SUFFIX)
+
+    def _rescan(self, limit: float = None) -> int:
+        """Scan the directory, and restart counting the blobs written"""
+        self._written = 0
+        self._scanned = time.monotonic()
+
+        return self._scan(limit)
+
+    def _scan(self, limit: float = None) -> int:
+        """Scan the directory, removing temporary files left by interrupted
+        writes, and the least recently used blobs above `limit` bytes
+
+        Args:
+            limit (float): size to evict blobs down to, or None to keep
+                every blob
+
+        Returns:
+            int: total size of the files in the directory
+        """
+        blobs = []
+        size = 0
+        stale = time.time() - self._STALE_AGE
+
+        with os.scandir(self._directory) as entries:
+            for entry in entries:
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+
+                if entry.name.endswith(self._TMP_SUFFIX):
+                    if stat.st_mtime < stale:
+                        self._remove(entry.path)
+                    else:
+                        size += stat.st_size
+                elif entry.name.endswith(self._SUFFIX):
+                    blobs.append((stat.st_mtime, stat.st_size, entry.path))
+                    size += stat.st_size
+
+        if limit is not None:
+            for _, blob_size, path in sorted(blobs):
+                if size <= limit:
+                    break
+
+                self._remove(path)
+                size -= blob_size
+
+        return size
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            # removed by another process sharing the directory
+            pass
+
+
+class AggregationCache:
+    """Cache for aggregated surfaces, shared by every collection
+
+    Aggregations are keyed by the operation and a hash of the sorted
+    uuids and blob checksums of the aggregated surfaces. An aggregation
+    is therefore reused by any collection of the same surfaces, and not
+    served after surfaces are added, removed or changed.
+
+    Aggregations are kept in memory, up to `max_bytes`. With a
+    `directory`, they are also stored on disk in a `BlobCache`, shared
+    between sessions and processes.
+
+    Example::
+
+        sumo = Explorer(aggregation_cache=AggregationCache("/scratch/aggs"))
+    """
+
+    def __init__(
+        self,
+        directory: str = None,
+        max_bytes: int = 256 * 1024**2,
+        max_disk_bytes: int = 10 * 1024**3,
+    ):
+        """
+        Args:
+            directory (str): directory to store aggregations in, if any
+            max_bytes (int): maximum total size of aggregations in memory
+            max_disk_bytes (int): maximum total size of aggregations on disk
+        """
+        self._max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+        self._disk = (
+            BlobCache(directory, max_disk_bytes) if directory else None
+        )
+
+    @property
+    def hits(self) -> int:
+        """Number of aggregations read from the cache"""
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        """Number of aggregations not found in the cache"""
+        return self._misses
+
+    @staticmethod
+    def key(operation: str, objects: List[Tuple[str, str]]) -> str:
+        """Get cache key of an aggregation
+
+        Args:
+            operation (str): aggregation operation
+            objects (List[Tuple[str, str]]): uuid and blob checksum of
+                each aggregated surface
+
+        Returns:
+            str: the key
+        """
+        digest = hashlib.sha256()
+
+        for uuid, md5 in sorted(objects, key=lambda obj: obj[0]):
+            digest.update(f"{uuid}:{md5};".encode("utf-8"))
+
+        return f"{operation}:{digest.hexdigest()}"
+
+    def get(self, operation: str, objects: List[Tuple[str, str]]) -> bytes:
+        """Get cached aggregation
+
+        Args:
+            operation (str): aggregation operation
+            objects (List[Tuple[str, str]]): uuid and blob checksum of
+                each aggregated surface
+
+        Returns:
+            bytes: the aggregated surface, or None
+        """
+        key = self.key(operation, objects)
+
+        with self._lock:
+            blob = self._entries.get(key)
+
+            if blob is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return blob
+
+        if self._disk is not None:
+            blob = self._disk.get(key)
+
+            if blob is not None:
+                self._remember(key, blob)
+
+        with self._lock:
+            if blob is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+
+        return blob
+
+    def put(
+        self, operation: str, objects: List[Tuple[str, str]], blob: bytes
+    ) -> None:
+        """Cache aggregation
+
+        Args:
+            operation (str): aggregation operation
+            objects (List[Tuple[str, str]]): uuid and blob checksum of
+                each aggregated surface
+            blob (bytes): the aggregated surface
+        """
+        key = self.key(operation, objects)
+        self._remember(key, blob)
+
+        if self._disk is not None:
+            self._disk.put(key, blob)
+
+    def clear(self) -> None:
+        """Remove all cached aggregations, also from disk"""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+        if self._disk is not None:
+            self._disk.clear()
+
+    def _remember(self, key: str, blob: bytes) -> None:
+        if len(blob) > self._max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._size -= len(self._entries.pop(key))
+
+            self._entries[key] = blob
+            self._size += len(blob)
+
+            while self._size > self._max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
@@ -0,0 +1,279 @@
+"""Module containing clients recording and replaying requests to Sumo
+
+A cassette is a file with one recorded request per line, as JSON with
+the request method, path, body and parameters, the response and the time
+Sumo took to respond. Binary content, such as blobs, is base64 encoded.
+
+Cassettes hold the metadata and blobs returned by Sumo, and should be
+kept as safely as the data itself. Blob authorization URIs, SAS
+signatures and tokens are redacted when recording, so requests relying
+on them cannot be replayed.
+"""
+from typing import Dict, List
+from collections import deque
+import base64
+import copy
+import json
+import re
+import threading
+import time
+from sumo.wrapper import SumoClient
+from fmu.sumo.explorer.cache import _fingerprint
+
+_REDACTED = "REDACTED"
+_SECRET_PATHS = ("/authuri",)
+_SECRET_KEYS = frozenset(("access_token", "auth", "sas", "token"))
+_SAS_SIGNATURE = re.compile(r"(sig=)[^&\"\s]+")
+_SAS_SIGNATURE_BYTES = re.compile(_SAS_SIGNATURE.pattern.encode("ascii"))
+
+
+def _request_key(method: str, path: str, body: Dict, params: Dict) -> str:
+    """Get key identifying a request in a cassette"""
+    return _fingerprint(f"{method} {path}", {"json": body, "params": params})
+
+
+class CassetteResponse:
+    """Replayed response with the attributes of a SumoClient response"""
+
+    def __init__(self, content: bytes, status_code: int = 200) -> None:
+        self.content = content
+        self.status_code = status_code
+
+    @property
+    def text(self) -> str:
+        """Content as text"""
+        return self.content.decode("utf-8")
+
+    def json(self):
+        """Content parsed as JSON"""
+        return json.loads(self.content)
+
+
+class RecordingClient:
+    """Client recording every request and response to a cassette
+
+    Requests are passed on to the wrapped client, and appended to the
+    cassette as they complete, so a session is recorded even if it does
+    not end cleanly. The cassette is only open while a request is written
+    to it.
+
+    Responses with blob authorization URIs are replaced, and SAS
+    signatures and token fields are redacted, but cassettes still contain
+    the recorded metadata and blobs, and should not be shared more widely
+    than the data they were recorded from.
+
+    Example::
+
+        sumo = Explorer(record="session.jsonl")
+
+    or, with an existing client::
+
+        client = RecordingClient(SumoClient("prod"), "session.jsonl")
+        sumo = Explorer(sumo=client)
+    """
+
+    def __init__(self, sumo: SumoClient, cassette: str):
+        """
+        Args:
+            sumo (SumoClient): client to record requests of
+            cassette (str): path of cassette file to write
+        """
+        self._sumo = sumo
+        self._cassette = cassette
+        self._closed = False
+        self._lock = threading.Lock()
+
+        with open(cassette, "w", encoding="utf-8"):
+            pass
+
+    def __enter__(self) -> "RecordingClient":
+        return self
+
+    def __exit__(self, *_) -> bool:
+        self.close()
+        return False
+
+    def post(self, path: str, json: Dict = None, params: Dict = None):
+        """Send and record POST request"""
+        return self._record("post", path, json, params)
+
+    def get(self, path: str, params: Dict = None):
+        """Send and record GET request"""
+        return self._record("get", path, None, params)
+
+    def delete(self, path: str, params: Dict = None):
+        """Send and record DELETE request"""
+        return self._record("delete", path, None, params)
+
+    def close(self) -> None:
+        """Stop recording, later requests are passed on but not recorded"""
+        with self._lock:
+            self._closed = True
+
+    def __getattr__(self, name: str):
+        return getattr(self._sumo, name)
+
+    def _record(self, method: str, path: str, body: Dict, params: Dict):
+        kwargs = {} if params is None else {"params": params}
+
+        if body is not None:
+            kwargs["json"] = body
+
+        start = time.perf_counter()
+        res = getattr(self._sumo, method)(path, **kwargs)
+        latency = time.perf_counter() - start
+
+        if isinstance(res, (dict, list)):
+            kind, content, status_code = "json", _redact(res), None
+        elif isinstance(res, bytes):
+            kind, status_code = "bytes", None
+            content = _encode(_redact_bytes(path, res))
+        else:
+            kind = "response"
+            content = _encode(_redact_bytes(path, res.content))
+            status_code = res.status_code
+
+        line = json.dumps(
+            {
+                "method": method,
+                "path": path,
+                "json": body,
+                "params": params,
+                "latency": latency,
+                "kind": kind,
+                "content": content,
+                "status_code": status_code,
+            }
+        )
+
+        with self._lock:
+            if not self._closed:
+                with open(
+                    self._cassette, "a", encoding="utf-8"
+                ) as cassette_file:
+                    cassette_file.write(line + "\n")
+
+        return res
+
+
+class ReplayClient:
+    """Client serving responses recorded in a cassette
+
+    Requests are matched on method, path, body and parameters. Identical
+    requests are answered in the order they were recorded, and the last
+    response is repeated when the recorded ones run out.
+
+    With `timing="original"`, every response is delayed by the time Sumo
+    took to respond when it was recorded. With `timing="zero"`, responses
+    are returned immediately, leaving only the time spent in the client.
+
+    Example::
+
+        sumo = Explorer(sumo=ReplayClient("session.jsonl", timing="zero"))
+    """
+
+    def __init__(self, cassette: str, timing: str = "original"):
+        """
+        Args:
+            cassette (str): path of cassette file to read
+            timing (str): "original" or "zero"
+        """
+        if timing not in ("original", "zero"):
+            raise ValueError(f"Invalid timing: {timing}")
+
+        self._timing = timing
+        self._interactions = {}
+        self._lock = threading.Lock()
+
+        with open(cassette, encoding="utf-8") as cassette_file:
+            for line in cassette_file:
+                interaction = json.loads(line)
+                key = _request_key(
+                    interaction["method"],
+                    interaction["path"],
+                    interaction["json"],
+                    interaction["params"],
+                )
+                self._interactions.setdefault(key, deque()).append(
+                    interaction
+                )
+
+    def post(self, path: str, json: Dict = None, params: Dict = None):
+        """Replay POST request"""
+        return self._replay("post", path, json, params)
+
+    def get(self, path: str, params: Dict = None):
+        """Replay GET request"""
+        return self._replay("get", path, None, params)
+
+    def delete(self, path: str, params: Dict = None):
+        """Replay DELETE request"""
+        return self._replay("delete", path, None, params)
+
+    def _replay(self, method: str, path: str, body: Dict, params: Dict):
+        key = _request_key(method, path, body, params)
+
+        with self._lock:
+            recorded: List = self._interactions.get(key)
+
+            if recorded is None:
+                raise Exception(
+                    f"No recorded response for {method.upper()} {path}"
+                )
+
+            interaction = (
+                recorded.popleft() if len(recorded) > 1 else recorded[0]
+            )
+
+        if self._timing == "original":
+            time.sleep(interaction["latency"])
+
+        kind = interaction["kind"]
+
+        if kind == "json":
+            return copy.deepcopy(interaction["content"])
+
+        content = base64.b64decode(interaction["content"])
+
+        if kind == "bytes":
+            return content
+
+        return CassetteResponse(content, interaction["status_code"])
+
+
+def _encode(content: bytes) -> str:
+    return base64.b64encode(content).decode("ascii")
+
+
+def _redact(value):
+    """Copy of JSON value with token fields and SAS signatures redacted"""
+    if isinstance(value, dict):
+        return {
+            key: _REDACTED if key in _SECRET_KEYS else _redact(item)
+            for key, item in value.items()
+        }
+
+    if isinstance(value, list):
+        return [_redact(item) for item in value]
+
+    if isinstance(value, str):
+        return _SAS_SIGNATURE.sub(rf"\g<1>{_REDACTED}", value)
+
+    return value
+
+
+def _redact_bytes(path: str, content: bytes) -> bytes:
+    """Redact response content to request for path
+
+    Responses with authorization URIs are replaced, and SAS signatures
+    are redacted in other responses than blobs.
+    """
+    if path.endswith(_SECRET_PATHS):
+        return _REDACTED.encode("ascii")
+
+    if path.endswith("/blob"):
+        return content
+
+    return _SAS_SIGNATURE_BYTES.sub(
+        rb"\g<1>" + _REDACTED.encode("ascii"), content
+    )
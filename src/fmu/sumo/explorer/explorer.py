@@ -1,4 +1,5 @@
 """Module containing class for exploring results from sumo"""
+from typing import List
 from sumo.wrapper import SumoClient
 from fmu.sumo.explorer.pit import Pit
 from fmu.sumo.explorer.objects.case_collection import (
@@ -11,6 +12,10 @@ from fmu.sumo.explorer.objects.polygons import Polygons
 from fmu.sumo.explorer.objects.table import Table
 from fmu.sumo.explorer.objects.case import Case
 from fmu.sumo.explorer._utils import Utils
+from fmu.sumo.explorer._client import ExplorerClient
+from fmu.sumo.explorer.cache import QueryCache, BlobCache, AggregationCache
+from fmu.sumo.explorer.instrumentation import _hooks
+from fmu.sumo.explorer.cassette import RecordingClient
 
 
 class Explorer:
@@ -33,6 +38,14 @@ class Explorer:
         token: str = None,
         interactive: bool = True,
         keep_alive: str = None,
+        slices: int = 1,
+        auto_renew: bool = False,
+        cache: QueryCache = None,
+        blob_cache: BlobCache = None,
+        aggregation_cache: AggregationCache = None,
+        instrumentation=None,
+        sumo: SumoClient = None,
+        record: str = None,
     ):
         """Initialize the Explorer class
 
@@ -55,16 +68,96 @@ class Explorer:
         Every request to Sumo will extend the lifespan of the snapshot
         by the time specified in `keep_alive`.
 
+        With a snapshot, collections can be split into `slices` which are
+        paged through concurrently. This speeds up enumerating very large
+        collections, but documents are no longer returned in a fixed order.
+        Slices require a snapshot, so `slices` above 1 without
+        `keep_alive` raises a ValueError.
+
+        The snapshot holds resources in Sumo until it expires. Use the
+        Explorer as a context manager, or call `close`, to delete it when
+        done. For long running jobs with pauses between requests, set
+        `auto_renew` to extend the lifespan of the snapshot in the
+        background until it is closed::
+
+            with Explorer(keep_alive="5m", auto_renew=True) as sumo:
+                ...
+
+        Pass a `QueryCache` as `cache` to answer repeated search queries,
+        such as counts and unique values, without contacting Sumo. Pass a
+        `BlobCache` as `blob_cache` to keep downloaded blobs on disk, shared
+        between sessions and processes. Pass an `AggregationCache` as
+        `aggregation_cache` to reuse surface aggregations across
+        collections, and optionally across sessions.
+
+        Pass a hook, or a list of hooks, as `instrumentation` to record
+        every request sent to Sumo, e.g. a `LatencyAggregator` to find slow
+        calls, or a `JsonLinesExporter` to log requests to a file. A hook
+        is any object with a `record` method accepting a `RequestEvent`.
+
+        Pass a file path as `record` to record every request and response
+        to a cassette, which can be replayed offline by passing a
+        `ReplayClient` as `sumo`.
+
         Args:
             env (str): Sumo environment
             token (str): authenticate with existing token
             interactive (bool): authenticate using interactive flow (browser)
             keep_alive (str): point in time lifespan
+            slices (int): number of concurrent slices, requires keep_alive
+            auto_renew (bool): keep the point in time alive until closed
+            cache (QueryCache): cache for responses to search queries
+            blob_cache (BlobCache): persistent cache for object blobs
+            aggregation_cache (AggregationCache): cache for aggregations
+            instrumentation: hook or list of hooks recording requests
+            sumo (SumoClient): existing client to use instead of creating
+                one for `env`
+            record (str): path of cassette file to record requests to
         """
-        self._sumo = SumoClient(env, token=token, interactive=interactive)
-        self._pit = Pit(self._sumo, keep_alive) if keep_alive else None
+        if slices > 1 and keep_alive is None:
+            raise ValueError("slices requires keep_alive")
+
+        if sumo is None:
+            sumo = SumoClient(env, token=token, interactive=interactive)
+
+        self._recorder = None
+
+        if record is not None:
+            sumo = self._recorder = RecordingClient(sumo, record)
+
+        self._sumo = ExplorerClient(
+            sumo,
+            query_cache=cache,
+            blob_cache=blob_cache,
+            instrumentation=_hooks(instrumentation),
+            aggregation_cache=aggregation_cache,
+        )
+        self._pit = (
+            Pit(self._sumo, keep_alive, slices, auto_renew)
+            if keep_alive
+            else None
+        )
         self._utils = Utils(self._sumo)
 
+    def __enter__(self) -> "Explorer":
+        return self
+
+    def __exit__(self, *_) -> bool:
+        self.close()
+        return False
+
+    def close(self) -> None:
+        """Delete the point in time snapshot and close the cassette, if any
+
+        Collections and objects created by the Explorer can not be
+        queried after it is closed.
+        """
+        if self._pit is not None:
+            self._pit.close()
+
+        if self._recorder is not None:
+            self._recorder.close()
+
     @property
     def cases(self):
         """Cases in Sumo"""
@@ -97,7 +190,7 @@ class Explorer:
             Case: case object
         """
         metadata = self._utils.get_object(uuid, _CASE_FIELDS)
-        return Case(self._sumo, metadata)
+        return Case(self._sumo, metadata, self._pit)
 
     def get_surface_by_uuid(self, uuid: str) -> Surface:
         """Get surface object by uuid
@@ -134,3 +227,70 @@ class Explorer:
         """
         metadata = self._utils.get_object(uuid, _CHILD_FIELDS)
         return Table(self._sumo, metadata)
+
+    def get_objects_by_uuids(self, uuids: List[str], cls: type) -> List:
+        """Get objects by uuids
+
+        The uuids are looked up in chunks with concurrent requests, instead
+        of one request per uuid.
+
+        Args:
+            uuids (List[str]): object uuids
+            cls (type): object class, e.g. Case, Surface, Polygons or Table
+
+        Returns:
+            List: objects of type `cls`, in the same order as `uuids`
+
+        Raises:
+            Exception: listing every uuid that was not found
+        """
+        if issubclass(cls, Case):
+            docs = self._utils.get_objects_by_uuids(uuids, _CASE_FIELDS)
+            return [cls(self._sumo, doc, self._pit) for doc in docs]
+
+        docs = self._utils.get_objects_by_uuids(uuids, _CHILD_FIELDS)
+        return [cls(self._sumo, doc) for doc in docs]
+
+    def get_cases_by_uuids(self, uuids: List[str]) -> List[Case]:
+        """Get case objects by uuids
+
+        Args:
+            uuids (List[str]): case uuids
+
+        Returns:
+            List[Case]: case objects, in the same order as `uuids`
+        """
+        return self.get_objects_by_uuids(uuids, Case)
+
+    def get_surfaces_by_uuids(self, uuids: List[str]) -> List[Surface]:
+        """Get surface objects by uuids
+
+        Args:
+            uuids (List[str]): surface uuids
+
+        Returns:
+            List[Surface]: surface objects, in the same order as `uuids`
+        """
+        return self.get_objects_by_uuids(uuids, Surface)
+
+    def get_polygons_by_uuids(self, uuids: List[str]) -> List[Polygons]:
+        """Get polygons objects by uuids
+
+        Args:
+            uuids (List[str]): polygons uuids
+
+        Returns:
+            List[Polygons]: polygons objects, in the same order as `uuids`
+        """
+        return self.get_objects_by_uuids(uuids, Polygons)
+
+    def get_tables_by_uuids(self, uuids: List[str]) -> List[Table]:
+        """Get table objects by uuids
+
+        Args:
+            uuids (List[str]): table uuids
+
+        Returns:
+            List[Table]: table objects, in the same order as `uuids`
+        """
+        return self.get_objects_by_uuids(uuids, Table)
@@ -0,0 +1,266 @@
+"""Module containing instrumentation of requests sent to Sumo"""
+from typing import Dict, List, IO, Union
+from collections import deque
+import concurrent.futures
+import json
+import os
+import sys
+import threading
+import numpy as np
+
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+_CLIENT_FILE = os.path.join(_PACKAGE_DIR, "_client.py")
+_THREADING_FILES = (
+    threading.__file__,
+    os.path.dirname(concurrent.futures.__file__),
+)
+
+
+class RequestEvent:
+    """Record of a single request to Sumo
+
+    Attributes:
+        timestamp (float): time the request was sent, in seconds since epoch
+        method (str): HTTP method
+        path (str): request path, e.g. /search
+        fingerprint (str): hash of the path and query, ignoring the point
+            in time id, or None for requests without a query
+        latency (float): seconds until the response was received
+        size (int): size of the response content in bytes, or None
+        hits (int): number of documents returned by a search, or None
+        cache (str): "hit" or "miss" for requests eligible for the query
+            cache, otherwise None
+        operation (str): explorer function which sent the request
+        call_site (str): location of the code calling the explorer, as
+            file:line function
+    """
+
+    __slots__ = (
+        "timestamp",
+        "method",
+        "path",
+        "fingerprint",
+        "latency",
+        "size",
+        "hits",
+        "cache",
+        "operation",
+        "call_site",
+    )
+
+    def __init__(
+        self,
+        timestamp: float,
+        method: str,
+        path: str,
+        fingerprint: str,
+        latency: float,
+        size: int,
+        hits: int,
+        cache: str,
+        operation: str,
+        call_site: str,
+    ) -> None:
+        self.timestamp = timestamp
+        self.method = method
+        self.path = path
+        self.fingerprint = fingerprint
+        self.latency = latency
+        self.size = size
+        self.hits = hits
+        self.cache = cache
+        self.operation = operation
+        self.call_site = call_site
+
+    def to_dict(self) -> Dict:
+        """Get the event as a dictionary"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        return (
+            f"<RequestEvent {self.method} {self.path} "
+            f"{self.latency * 1000:.1f}ms from {self.call_site}>"
+        )
+
+
+def _caller() -> tuple:
+    """Find the explorer function sending a request, and its caller
+
+    Returns:
+        tuple: explorer operation and call site outside the explorer
+    """
+    frame = sys._getframe(1)  # pylint: disable=protected-access
+    operation = None
+
+    while frame is not None:
+        code = frame.f_code
+        filename = code.co_filename
+
+        if not filename.startswith(_PACKAGE_DIR):
+            if not filename.startswith(_THREADING_FILES):
+                call_site = f"{filename}:{frame.f_lineno} {code.co_name}"
+                return operation, call_site
+        elif operation is None and filename != _CLIENT_FILE:
+            operation = getattr(code, "co_qualname", code.co_name)
+
+        frame = frame.f_back
+
+    # requests from worker threads have no caller outside the explorer
+    return operation, operation
+
+
+class LatencyAggregator:
+    """In-memory aggregation of request latencies per call site
+
+    Keeps the latencies of the most recent `max_samples` requests per
+    call site, and summarizes them as percentiles.
+
+    Example::
+
+        stats = LatencyAggregator()
+        sumo = Explorer(instrumentation=stats)
+
+        ...
+
+        for call_site, summary in stats.summary().items():
+            print(call_site, summary["p95"])
+    """
+
+    def __init__(self, key: str = "call_site", max_samples: int = 10000):
+        """
+        Args:
+            key (str): event attribute to group by, e.g. call_site,
+                operation or path
+            max_samples (int): number of latencies kept per group
+        """
+        if key not in RequestEvent.__slots__:
+            raise ValueError(f"Invalid key: {key}")
+
+        self._key = key
+        self._max_samples = max_samples
+        self._groups = {}
+        self._lock = threading.Lock()
+
+    def record(self, event: RequestEvent) -> None:
+        """Add request to the aggregation
+
+        Args:
+            event (RequestEvent): the request
+        """
+        key = getattr(event, self._key)
+
+        with self._lock:
+            group = self._groups.get(key)
+
+            if group is None:
+                group = {
+                    "latencies": deque(maxlen=self._max_samples),
+                    "count": 0,
+                    "bytes": 0,
+                    "hits": 0,
+                    "cache_hits": 0,
+                }
+                self._groups[key] = group
+
+            group["latencies"].append(event.latency)
+            group["count"] += 1
+            group["bytes"] += event.size or 0
+            group["hits"] += event.hits or 0
+            group["cache_hits"] += event.cache == "hit"
+
+    def summary(self) -> Dict[str, Dict]:
+        """Summarize latencies per group
+
+        Returns:
+            Dict: for every group, the number of requests, latency
+            percentiles p50, p95 and p99 in seconds, total bytes, total
+            hits and number of cache hits, ordered by total latency
+        """
+        with self._lock:
+            groups = [
+                (key, dict(group, latencies=np.array(group["latencies"])))
+                for key, group in self._groups.items()
+            ]
+
+        groups.sort(key=lambda item: -item[1]["latencies"].sum())
+        summary = {}
+
+        for key, group in groups:
+            p50, p95, p99 = np.percentile(group["latencies"], [50, 95, 99])
+            summary[key] = {
+                "count": group["count"],
+                "p50": float(p50),
+                "p95": float(p95),
+                "p99": float(p99),
+                "bytes": group["bytes"],
+                "hits": group["hits"],
+                "cache_hits": group["cache_hits"],
+            }
+
+        return summary
+
+    def clear(self) -> None:
+        """Remove all recorded requests"""
+        with self._lock:
+            self._groups.clear()
+
+
+class JsonLinesExporter:
+    """Write requests to a file, one JSON object per line
+
+    Example::
+
+        with JsonLinesExporter("requests.jsonl") as exporter:
+            sumo = Explorer(instrumentation=exporter)
+            ...
+    """
+
+    def __init__(self, file: Union[str, IO]):
+        """
+        Args:
+            file (str or file object): path of file to append to, or an
+                open text file
+        """
+        if isinstance(file, (str, os.PathLike)):
+            self._file = open(file, "a", encoding="utf-8")
+            self._owned = True
+        else:
+            self._file = file
+            self._owned = False
+
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "JsonLinesExporter":
+        return self
+
+    def __exit__(self, *_) -> bool:
+        self.close()
+        return False
+
+    def record(self, event: RequestEvent) -> None:
+        """Write request to the file
+
+        Args:
+            event (RequestEvent): the request
+        """
+        line = json.dumps(event.to_dict()) + "\n"
+
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self) -> None:
+        """Close the file, if opened by the exporter"""
+        if self._owned:
+            self._file.close()
+
+
+def _hooks(instrumentation) -> List:
+    """Get list of hooks from a hook, a list of hooks or None"""
+    if instrumentation is None:
+        return []
+
+    if isinstance(instrumentation, (list, tuple)):
+        return list(instrumentation)
+
+    return [instrumentation]
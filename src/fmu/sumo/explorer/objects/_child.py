@@ -8,6 +8,8 @@ from fmu.sumo.explorer.objects._document import Document
 class Child(Document):
     """Class representing a child object in Sumo"""
 
+    __slots__ = ("_sumo", "_blob")
+
     def __init__(self, sumo: SumoClient, metadata: Dict) -> None:
         """
         Args:
@@ -21,63 +23,95 @@ class Child(Document):
     @property
     def name(self) -> str:
         """Object name"""
-        return self._get_property(["data", "name"])
+        return self._get_property(("data", "name"))
 
     @property
     def tagname(self) -> str:
         """Object tagname"""
-        return self._get_property(["data", "tagname"])
+        return self._get_property(("data", "tagname"))
     
     @property
     def stratigraphic(self) -> str:
         """Object stratigraphic"""
-        return self._get_property(["data", "stratigraphic"])
+        return self._get_property(("data", "stratigraphic"))
     
     @property
     def vertical_domain(self) -> str:
         """Object vertical_domain"""
-        return self._get_property(["data", "vertical_domain"])
+        return self._get_property(("data", "vertical_domain"))
 
     @property
     def context(self) -> str:
         """Object context"""
-        return self._get_property(["fmu", "context", "stage"])
+        return self._get_property(("fmu", "context", "stage"))
 
     @property
     def iteration(self) -> int:
         """Object iteration"""
-        return self._get_property(["fmu", "iteration", "name"])
+        return self._get_property(("fmu", "iteration", "name"))
 
     @property
     def realization(self) -> int:
         """Object realization"""
-        return self._get_property(["fmu", "realization", "id"])
+        return self._get_property(("fmu", "realization", "id"))
 
     @property
     def aggregation(self) -> str:
         """Object aggregation operation"""
-        return self._get_property(["fmu", "aggregation", "operation"])
+        return self._get_property(("fmu", "aggregation", "operation"))
 
     @property
     def stage(self) -> str:
         """Object stage"""
-        return self._get_property(["fmu", "context", "stage"])
+        return self._get_property(("fmu", "context", "stage"))
 
     @property
     def format(self) -> str:
         """Object file format"""
-        return self._get_property(["data", "format"])
+        return self._get_property(("data", "format"))
 
     @property
     def relative_path(self) -> str:
         """Object relative file path"""
-        return self._get_property(["file", "relative_path"])
+        return self._get_property(("file", "relative_path"))
 
     @property
     def blob(self) -> BytesIO:
         """Object blob"""
         if self._blob is None:
-            res = self._sumo.get(f"/objects('{self.uuid}')/blob")
-            self._blob = BytesIO(res)
+            self._blob = BytesIO(self._get_blob())
 
         return self._blob
+
+    def _get_blob(self) -> bytes:
+        """Download object blob, using the blob cache of the client if any
+
+        Returns:
+            bytes: the blob content
+        """
+        blob_cache = getattr(self._sumo, "blob_cache", None)
+        md5 = self._get_property(("_sumo", "blob_md5"))
+
+        if blob_cache is None or md5 is None:
+            return self._download_blob()
+
+        key = f"{self.uuid}:{md5}"
+        blob = blob_cache.get(key)
+
+        if blob is None:
+            blob = self._download_blob()
+            blob_cache.put(key, blob)
+
+        return blob
+
+    def _download_blob(self) -> bytes:
+        """Download object blob from Sumo
+
+        Clients return either the content or the response of the request.
+
+        Returns:
+            bytes: the blob content
+        """
+        res = self._sumo.get(f"/objects('{self.uuid}')/blob")
+
+        return getattr(res, "content", res)
@@ -22,15 +22,38 @@ _CHILD_FIELDS = [
     "fmu.context.stage",
     "fmu.aggregation.operation",
     "_sumo.status",
+    "_sumo.blob_md5",
     "access.asset",
     "masterdata.smda.field",
     "file.relative_path",
 ]
 
+_CHILD_FRAME_FIELDS = [
+    "data.name",
+    "data.tagname",
+    "data.format",
+    "data.stratigraphic",
+    "data.vertical_domain",
+    "data.time.t0.value",
+    "data.time.t1.value",
+    "fmu.case.name",
+    "fmu.case.user.id",
+    "fmu.realization.id",
+    "fmu.iteration.name",
+    "fmu.context.stage",
+    "fmu.aggregation.operation",
+    "_sumo.status",
+    "_sumo.blob_md5",
+    "access.asset.name",
+    "file.relative_path",
+]
+
 
 class ChildCollection(DocumentCollection):
     """Class for representing a collection of child objects in Sumo"""
 
+    _frame_fields = _CHILD_FRAME_FIELDS
+
     def __init__(
         self,
         doc_type: str,
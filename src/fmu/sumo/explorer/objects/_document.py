@@ -1,10 +1,12 @@
 """Contains class for one document"""
-from typing import List, Dict
+from typing import Sequence, Dict
 
 
 class Document:
     """Class for representing a document in Sumo"""
 
+    __slots__ = ("_uuid", "_metadata")
+
     def __init__(self, metadata: Dict) -> None:
         self._uuid = metadata["_id"]
         self._metadata = metadata["_source"]
@@ -27,14 +29,25 @@ class Document:
         """
         return self._metadata
 
-    def _get_property(self, path: List[str]):
-        curr = self._metadata.copy()
+    def _get_property(self, path: Sequence[str]):
+        """Get value at a path in the metadata, without copying
+
+        Paths are passed as tuples of constants, which Python does not
+        allocate per call.
+
+        Args:
+            path (Sequence[str]): keys leading to the value
+
+        Returns:
+            The value, or None if the path does not exist
+        """
+        curr = self._metadata
 
-        for key in path:
-            if key in curr:
+        try:
+            for key in path:
                 curr = curr[key]
-            else:
-                return None
+        except (KeyError, TypeError):
+            return None
 
         return curr
 
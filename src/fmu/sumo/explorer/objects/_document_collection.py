@@ -1,13 +1,31 @@
 """Module containing class for collection of documents"""
-from typing import List, Dict
+from typing import List, Dict, Iterator, Tuple, Union, Any
+from collections import OrderedDict
+from itertools import repeat
+import json
+import pandas as pd
+import pyarrow as pa
 from sumo.wrapper import SumoClient
 from fmu.sumo.explorer._utils import Utils
+from fmu.sumo.explorer._prefetch import ReadAhead, Interleave
 from fmu.sumo.explorer.pit import Pit
 
+_BATCH_SIZE = 500
+
+# largest offset plus size Elasticsearch accepts for from/size paging
+_MAX_RESULT_WINDOW = 10000
+
+# number of batches fetched by jumping ahead kept, least recently used
+# first out
+_MAX_JUMPED_BATCHES = 8
+
 
 class DocumentCollection:
     """Class for representing a collection of documents in Sumo"""
 
+    # scalar fields in tables made by to_metadata_frame by default
+    _frame_fields: List[str] = []
+
     def __init__(
         self,
         doc_type: str,
@@ -19,13 +37,15 @@ class DocumentCollection:
         self._utils = Utils(sumo)
         self._type = doc_type
         self._sumo = sumo
-        self._query = self._init_query(doc_type, query)
         self._pit = pit
 
         self._after = None
         self._curr_index = 0
         self._len = None
         self._items = []
+        self._jumped = OrderedDict()
+        self._batches = None
+        self._prefetch = 0
         self._field_values = {}
         self._query = self._init_query(doc_type, query)
         self._select = select
@@ -33,91 +53,510 @@ class DocumentCollection:
     def __len__(self) -> int:
         """Get size of document collection
 
+        The size is found with a count request which returns no documents,
+        unless it is already known from fetching the first batch.
+
         Returns:
             Document collection size
         """
         if self._len is None:
-            self._next_batch()
+            self._len = self._count()
 
         return self._len
 
-    def __getitem__(self, index: int) -> Dict:
+    def __getitem__(self, index: Union[int, slice]) -> Any:
         """Get document
 
+        Negative indexes count from the end of the collection, and slices
+        return a List of documents. Documents far beyond those already
+        fetched are fetched directly, without fetching every batch before
+        them. The last few batches fetched this way are kept.
+
         Arguments:
-            - index (int): index
+            - index (int or slice): index
 
         Returns:
             A document at a given index
         """
-        if index >= self.__len__():
+        if isinstance(index, slice):
+            return [
+                self._make_object(self._get_document(i))
+                for i in range(*index.indices(len(self)))
+            ]
+
+        if index < 0:
+            index += len(self)
+
+        if index < 0 or (self._len is not None and index >= self._len):
             raise IndexError
 
-        if len(self._items) <= index:
-            while len(self._items) <= index:
-                prev_len = len(self._items)
-                self._next_batch()
-                curr_len = len(self._items)
+        return self._make_object(self._get_document(index))
+
+    def _get_document(self, index: int) -> Dict:
+        """Get document metadata at a non-negative index
+
+        Arguments:
+            - index (int): index
+
+        Returns:
+            The document metadata
+        """
+        if index < len(self._items):
+            return self._items[index]
+
+        sliced = self._pit is not None and self._pit.slices > 1
+
+        if index >= len(self._items) + _BATCH_SIZE and not sliced:
+            start = index - index % _BATCH_SIZE
 
-                if prev_len == curr_len:
-                    raise IndexError
+            if start in self._jumped:
+                self._jumped.move_to_end(start)
+            else:
+                self._jumped[start] = self._jump_batch(start)
+
+                if len(self._jumped) > _MAX_JUMPED_BATCHES:
+                    self._jumped.popitem(last=False)
+
+            batch = self._jumped[start]
+
+            if index - start >= len(batch):
+                raise IndexError
+
+            return batch[index - start]
+
+        while len(self._items) <= index:
+            if len(self._next_batch()) == 0:
+                raise IndexError
 
         return self._items[index]
 
+    def _jump_batch(self, start: int) -> List[Dict]:
+        """Fetch the batch of documents starting at an offset
+
+        Offsets within the Elasticsearch result window are fetched with
+        from/size. Beyond it, the search_after cursor is advanced past the
+        preceding documents with requests returning no metadata.
+
+        Arguments:
+            - start (int): offset of the first document in the batch
+
+        Returns:
+            The batch of documents
+        """
+        if start + _BATCH_SIZE <= _MAX_RESULT_WINDOW:
+            return self._search(offset=start)
+
+        position, after = len(self._items), self._after
+
+        while position < start:
+            size = min(start - position, _MAX_RESULT_WINDOW)
+            hits = self._search(after, select=False, size=size)
+
+            if len(hits) == 0:
+                return []
+
+            position += len(hits)
+            after = hits[-1]["sort"]
+
+        return self._search(after)
+
+    def stream(self) -> Iterator[Any]:
+        """Iterate over documents without keeping them in the collection
+
+        Documents are fetched batch by batch, and each batch is dropped
+        once it has been consumed, so memory use stays flat regardless of
+        the size of the collection. Iterating the collection directly
+        keeps every fetched document for later indexing.
+
+        Returns:
+            Iterator over the documents in the collection
+
+        Example::
+
+            for table in case.tables.filter(name="summary").stream():
+                print(table.realization)
+        """
+        for batch in self._batch_source():
+            for doc in batch:
+                yield self._make_object(doc)
+
+    def to_metadata_frame(
+        self, fields: List[str] = None, arrow: bool = False
+    ) -> Union[pd.DataFrame, pa.Table]:
+        """Get metadata of all documents as a table
+
+        Only the selected fields are fetched, batch by batch, and written
+        straight into columns without creating an object per document.
+        Fields missing in a document are null. Fields must hold scalar
+        values; select the leaf fields of objects, e.g. "access.asset.name"
+        rather than "access.asset".
+
+        Arguments:
+            - fields (List[str]): metadata fields, e.g. "data.name".
+              Defaults to the common scalar fields of the collection
+            - arrow (bool): return a pyarrow Table instead of a DataFrame
+
+        Returns:
+            Table with an `_id` column and one column per field
+
+        Raises:
+            ValueError: if a field holds an object or a list
+
+        Example::
+
+            frame = case.surfaces.to_metadata_frame(
+                ["data.name", "fmu.realization.id"]
+            )
+            frame.groupby("fmu.realization.id").size()
+        """
+        if fields is None:
+            fields = list(self._frame_fields)
+
+        paths = [field.split(".") for field in fields]
+        columns = {field: [] for field in ["_id"] + fields}
+
+        for batch in self._batch_source(select=fields):
+            columns["_id"].extend(hit["_id"] for hit in batch)
+
+            for field, path in zip(fields, paths):
+                column = columns[field]
+
+                for hit in batch:
+                    value = hit["_source"]
+
+                    for key in path:
+                        if isinstance(value, list):
+                            break
+
+                        if isinstance(value, dict):
+                            value = value.get(key)
+                        else:
+                            value = None
+
+                    if isinstance(value, (dict, list)):
+                        raise ValueError(
+                            f"Field {field} is not a scalar field"
+                        )
+
+                    column.append(value)
+
+        if arrow:
+            return pa.table(columns)
+
+        return pd.DataFrame(columns)
+
+    def _make_object(self, doc: Dict) -> Any:
+        """Create an object representing a document
+
+        Arguments:
+            - doc (Dict): document metadata
+
+        Returns:
+            The document
+        """
+        return doc
+
     def _get_field_values(
         self, field: str, query: Dict = None, key_as_string: bool = False
     ) -> List:
         """Get List of unique values for a given field
 
+        Values of fields aggregated with an extra query, or formatted as
+        strings, are cached apart from the plain values cached by `facets`.
+
         Arguments:
             - field (str): a metadata field
+            - query (Dict): extra query narrowing the documents
+            - key_as_string (bool): get the values formatted as strings
 
         Returns:
             A List of unique values for the given field
         """
-        if field not in self._field_values:
+        key = field
+
+        if query is not None or key_as_string:
+            key = (field, json.dumps(query, sort_keys=True), key_as_string)
+
+        if key not in self._field_values:
             bucket_query = self._utils.extend_query_object(self._query, query)
-            key = "key_as_string" if key_as_string is True else "key"
-            buckets = self._utils.get_buckets(field, bucket_query)
-            self._field_values[field] = list(
-                map(lambda bucket: bucket[key], buckets)
-            )
 
-        return self._field_values[field]
+            if key_as_string is True:
+                # composite aggregations do not format keys of date fields
+                buckets = self._utils.get_terms_buckets(field, bucket_query)
+                values = [bucket["key_as_string"] for bucket in buckets]
+            else:
+                buckets = self._utils.iterate_buckets(field, bucket_query)
+                values = [bucket["key"] for bucket in buckets]
+
+            self._field_values[key] = values
+
+        return self._field_values[key]
+
+    def prefetch(self, depth: int = 1) -> "DocumentCollection":
+        """Fetch upcoming batches of documents in the background
+
+        While the documents of one batch are being consumed, the next
+        `depth` batches are requested from Sumo by a background worker,
+        hiding the latency of paging through large collections.
+
+        Arguments:
+            - depth (int): number of batches to read ahead, 0 to disable
+
+        Returns:
+            The collection itself, to allow chaining
+
+        Example::
+
+            for surf in case.surfaces.filter(iteration="iter-0").prefetch(2):
+                print(surf.name)
+        """
+        if depth < 0:
+            raise ValueError(f"Invalid prefetch depth: {depth}")
+
+        if isinstance(self._batches, (ReadAhead, Interleave)):
+            self._batches.close()
+
+        self._batches = None
+        self._prefetch = depth
+
+        return self
+
+    def facets(
+        self, fields: List[str], doc_counts: bool = False
+    ) -> Dict[str, Union[List, Dict]]:
+        """Get unique values for several metadata fields in one request
+
+        The values are cached, so properties listing unique values for
+        the same fields (such as `names` or `realizations`) are answered
+        without further requests.
+
+        Arguments:
+            - fields (List[str]): metadata fields, e.g. "data.name.keyword"
+            - doc_counts (bool): include the number of documents per value
+
+        Returns:
+            Dict mapping each field to a List of unique values, or with
+            `doc_counts` to a Dict mapping each value to its document count
+
+        Example::
+
+            facets = case.surfaces.facets(
+                ["data.name.keyword", "fmu.realization.id"]
+            )
+        """
+        missing = [
+            field
+            for field in fields
+            if doc_counts or field not in self._field_values
+        ]
+
+        if len(missing) > 0:
+            buckets = self._utils.get_facet_buckets(missing, self._query)
+        else:
+            buckets = {}
+
+        facets = {}
+
+        for field in fields:
+            if field in buckets:
+                values = [bucket["key"] for bucket in buckets[field]]
+                self._field_values[field] = values
+
+            if doc_counts:
+                facets[field] = {
+                    bucket["key"]: bucket["doc_count"]
+                    for bucket in buckets[field]
+                }
+            else:
+                facets[field] = self._field_values[field]
+
+        return facets
 
     def _next_batch(self) -> List[Dict]:
         """Get next batch of documents
 
+        With a sliced point in time, the cursor holds the sort values of
+        the last document fetched from each slice, so every slice resumes
+        from its own position when the batches are restarted.
+
         Returns:
             The next batch of documents
         """
+        if self._batches is None:
+            self._batches = self._slice_batches(self._after)
+
+        slice_index, hits = next(self._batches, (None, []))
+
+        if len(hits) > 0:
+            if slice_index is None:
+                self._after = hits[-1]["sort"]
+            else:
+                self._after = dict(self._after or {})
+                self._after[slice_index] = hits[-1]["sort"]
+
+            self._items.extend(hits)
+
+        return hits
+
+    def _batch_source(
+        self, after: List = None, select: List[str] = None
+    ) -> Iterator[List[Dict]]:
+        """Get iterator over batches of documents, reading ahead if enabled
+
+        Arguments:
+            - after (List): sort values of the last document already fetched
+            - select (List[str]): metadata fields to fetch instead of the
+              collection's fields
+
+        Returns:
+            Iterator over batches of documents
+        """
+        return (hits for _, hits in self._slice_batches(after, select))
+
+    def _slice_batches(
+        self, after: Union[List, Dict] = None, select: List[str] = None
+    ) -> Iterator[Tuple[int, List[Dict]]]:
+        """Get iterator over batches of documents and the slice they come
+        from, reading ahead if enabled
+
+        With a sliced point in time, the slices are paged through
+        concurrently and their batches merged. Otherwise the slice is None.
+
+        Arguments:
+            - after (List or Dict): sort values of the last document already
+              fetched, or with slices a Dict of them for each slice
+            - select (List[str]): metadata fields to fetch instead of the
+              collection's fields
+
+        Returns:
+            Iterator over tuples of slice and batch of documents
+        """
+        if self._pit is not None and self._pit.slices > 1:
+            if self._len is None:
+                self._len = self._count()
+
+            slices = self._pit.slices
+            after = after or {}
+            batches = Interleave(
+                [
+                    zip(
+                        repeat(i),
+                        self._search_batches(
+                            after.get(i), select, slice_id=(i, slices)
+                        ),
+                    )
+                    for i in range(slices)
+                ]
+            )
+        else:
+            batches = zip(repeat(None), self._search_batches(after, select))
+
+        if self._prefetch > 0:
+            batches = ReadAhead(batches, self._prefetch)
+
+        return batches
+
+    def _search_batches(
+        self,
+        after: List = None,
+        select: List[str] = None,
+        slice_id: Tuple[int, int] = None,
+    ) -> Iterator[List[Dict]]:
+        """Generate batches of documents using the search_after cursor
+
+        Arguments:
+            - after (List): sort values of the last document already fetched
+            - select (List[str]): metadata fields to fetch instead of the
+              collection's fields
+            - slice_id (Tuple[int, int]): slice id and number of slices
+
+        Returns:
+            Iterator over batches of documents
+        """
+        while True:
+            hits = self._search(after, select, slice_id=slice_id)
+
+            if len(hits) == 0:
+                return
+
+            after = hits[-1]["sort"]
+            yield hits
+
+    def _search(
+        self,
+        after: List = None,
+        select: Union[List[str], bool] = None,
+        size: int = _BATCH_SIZE,
+        offset: int = None,
+        slice_id: Tuple[int, int] = None,
+    ) -> List[Dict]:
+        """Search for one batch of documents
+
+        Arguments:
+            - after (List): sort values of the last document already fetched
+            - select (List[str] or bool): metadata fields to fetch instead of
+              the collection's fields, or False for no metadata
+            - size (int): number of documents
+            - offset (int): number of documents to skip
+            - slice_id (Tuple[int, int]): slice id and number of slices
+
+        Returns:
+            The batch of documents
+        """
         query = {
             "query": self._query,
             "sort": [{"_doc": {"order": "desc"}}],
-            "size": 500,
+            "size": size,
         }
 
-        if self._select:
+        if select is not None:
+            query["_source"] = select
+        elif self._select:
             query["_source"] = self._select
 
         if self._len is None:
             query["track_total_hits"] = True
 
-        if self._after is not None:
-            query["search_after"] = self._after
+        if after is not None:
+            query["search_after"] = after
+
+        if offset is not None:
+            query["from"] = offset
 
         if self._pit is not None:
             query["pit"] = self._pit.get_pit_object()
 
+        if slice_id is not None:
+            query["slice"] = {"id": slice_id[0], "max": slice_id[1]}
+
         res = self._sumo.post("/search", json=query).json()
         hits = res["hits"]
 
+        if self._pit is not None:
+            self._pit.update(res.get("pit_id"))
+
         if self._len is None:
             self._len = hits["total"]["value"]
 
-        if len(hits["hits"]) > 0:
-            self._after = hits["hits"][-1]["sort"]
-            self._items.extend(hits["hits"])
+        return hits["hits"]
+
+    def _count(self) -> int:
+        """Count documents in the collection without fetching any
+
+        Returns:
+            The number of documents matching the collection query
+        """
+        query = {"query": self._query, "size": 0, "track_total_hits": True}
+
+        if self._pit is not None:
+            query["pit"] = self._pit.get_pit_object()
+
+        res = self._sumo.post("/search", json=query).json()
+
+        if self._pit is not None:
+            self._pit.update(res.get("pit_id"))
+
+        return res["hits"]["total"]["value"]
 
     def _init_query(self, doc_type: str, query: Dict = None) -> Dict:
         """Initialize base filter for document collection
@@ -13,6 +13,8 @@ from fmu.sumo.explorer.pit import Pit
 class Case(Document):
     """Class for representing a case in Sumo"""
 
+    __slots__ = ("_pit", "_sumo", "_utils", "_iterations")
+
     def __init__(self, sumo: SumoClient, metadata: Dict, pit: Pit = None):
         super().__init__(metadata)
         self._pit = pit
@@ -23,71 +25,63 @@ class Case(Document):
     @property
     def name(self) -> str:
         """Case name"""
-        return self._get_property(["fmu", "case", "name"])
+        return self._get_property(("fmu", "case", "name"))
 
     @property
     def status(self) -> str:
         """Case status"""
-        return self._get_property(["_sumo", "status"])
+        return self._get_property(("_sumo", "status"))
 
     @property
     def user(self) -> str:
         """Name of user who uploaded the case"""
-        return self._get_property(["fmu", "case", "user", "id"])
+        return self._get_property(("fmu", "case", "user", "id"))
 
     @property
     def asset(self) -> str:
         """Case asset"""
-        return self._get_property(["access", "asset", "name"])
+        return self._get_property(("access", "asset", "name"))
 
     @property
     def field(self) -> str:
         """Case field"""
-        fields = self._get_property(["masterdata", "smda", "field"])
+        fields = self._get_property(("masterdata", "smda", "field"))
         return fields[0]["identifier"]
 
     @property
     def iterations(self) -> List[Dict]:
         """List of case iterations"""
         if self._iterations is None:
-            query = {
-                "query": {"term": {"_sumo.parent_object.keyword": self.uuid}},
-                "aggs": {
-                    "id": {
-                        "terms": {"field": "fmu.iteration.id", "size": 50},
-                        "aggs": {
-                            "name": {
-                                "terms": {
-                                    "field": "fmu.iteration.name.keyword",
-                                    "size": 1,
-                                }
-                            },
-                            "realizations": {
-                                "terms": {
-                                    "field": "fmu.realization.id",
-                                    "size": 1000,
-                                }
-                            },
-                        },
-                    },
-                },
-                "size": 0,
-            }
-
-            res = self._sumo.post("/search", json=query)
-            buckets = res.json()["aggregations"]["id"]["buckets"]
-            iterations = []
+            buckets = self._utils.iterate_composite_buckets(
+                [
+                    "fmu.iteration.id",
+                    "fmu.iteration.name.keyword",
+                    "fmu.realization.id",
+                ],
+                query={"term": {"_sumo.parent_object.keyword": self.uuid}},
+                missing_bucket=True,
+            )
+            iterations = {}
 
             for bucket in buckets:
-                iterations.append(
-                    {
-                        "id": bucket["key"],
-                        "name": bucket["name"]["buckets"][0]["key"],
-                        "realizations": len(bucket["realizations"]["buckets"]),
+                key = bucket["key"]
+                iteration_id = key["fmu.iteration.id"]
+                name = key["fmu.iteration.name.keyword"]
+
+                if iteration_id is None or name is None:
+                    continue
+
+                if iteration_id not in iterations:
+                    iterations[iteration_id] = {
+                        "id": iteration_id,
+                        "name": name,
+                        "realizations": 0,
                     }
-                )
 
-            self._iterations = iterations
+                if key["fmu.realization.id"] is not None:
+                    iterations[iteration_id]["realizations"] += 1
+
+            self._iterations = list(iterations.values())
 
         return self._iterations
 
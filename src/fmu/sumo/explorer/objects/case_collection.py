@@ -14,10 +14,19 @@ _CASE_FIELDS = [
     "masterdata.smda.field",
 ]
 
+_CASE_FRAME_FIELDS = [
+    "fmu.case.name",
+    "fmu.case.user.id",
+    "_sumo.status",
+    "access.asset.name",
+]
+
 
 class CaseCollection(DocumentCollection):
     """A class for representing a collection of cases in Sumo"""
 
+    _frame_fields = _CASE_FRAME_FIELDS
+
     def __init__(self, sumo: SumoClient, query: Dict = None, pit: Pit = None):
         """
         Args:
@@ -54,8 +63,7 @@ class CaseCollection(DocumentCollection):
             "masterdata.smda.field.identifier.keyword"
         )
 
-    def __getitem__(self, index: int) -> Case:
-        doc = super().__getitem__(index)
+    def _make_object(self, doc: Dict) -> Case:
         return Case(self._sumo, doc, self._pit)
 
     def filter(
@@ -9,6 +9,8 @@ from fmu.sumo.explorer.objects._child import Child
 class Cube(Child):
     """Class representig a seismic cube object in Sumo"""
 
+    __slots__ = ("_url", "_sas")
+
     def __init__(self, sumo: SumoClient, metadata: Dict) -> None:
         """
         Args:
@@ -44,8 +46,8 @@ class Cube(Child):
     @property
     def timestamp(self) -> str:
         """Surface timestmap data"""
-        t0 = self._get_property(["data", "time", "t0", "value"])
-        t1 = self._get_property(["data", "time", "t1", "value"])
+        t0 = self._get_property(("data", "time", "t0", "value"))
+        t1 = self._get_property(("data", "time", "t1", "value"))
 
         if t0 is not None and t1 is None:
             return t0
@@ -55,8 +57,8 @@ class Cube(Child):
     @property
     def interval(self) -> str:
         """Surface interval data"""
-        t0 = self._get_property(["data", "time", "t0", "value"])
-        t1 = self._get_property(["data", "time", "t1", "value"])
+        t0 = self._get_property(("data", "time", "t0", "value"))
+        t1 = self._get_property(("data", "time", "t1", "value"))
 
         if t0 is not None and t1 is not None:
             return (t0, t1)
@@ -33,8 +33,7 @@ class CubeCollection(ChildCollection):
         """
         super().__init__("cube", sumo, case_uuid, query, pit)
 
-    def __getitem__(self, index) -> Cube:
-        doc = super().__getitem__(index)
+    def _make_object(self, doc: Dict) -> Cube:
         return Cube(self._sumo, doc)
 
     @property
@@ -9,6 +9,8 @@ from warnings import warn
 class Polygons(Child):
     """Class representig a polygons object in Sumo"""
 
+    __slots__ = ()
+
     def __init__(self, sumo: SumoClient, metadata: Dict) -> None:
         """
         Args:
@@ -25,8 +25,7 @@ class PolygonsCollection(ChildCollection):
         """
         super().__init__("polygons", sumo, case_uuid, query, pit)
 
-    def __getitem__(self, index) -> Polygons:
-        doc = super().__getitem__(index)
+    def _make_object(self, doc: Dict) -> Polygons:
         return Polygons(self._sumo, doc)
 
     def filter(
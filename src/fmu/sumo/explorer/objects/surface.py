@@ -1,27 +1,30 @@
 """Module containg class for surface"""
 from typing import Dict
-from xtgeo import RegularSurface, surface_from_file
+from xtgeo import RegularSurface
 from fmu.sumo.explorer.objects._child import Child
+from fmu.sumo.explorer._irap import surface_from_blob
 
 
 class Surface(Child):
     """Class representing a surface object in Sumo"""
 
+    __slots__ = ()
+
     @property
     def bbox(self) -> Dict:
         """Surface bbox data"""
-        return self._get_property(["data", "bbox"])
+        return self._get_property(("data", "bbox"))
 
     @property
     def spec(self) -> Dict:
         """Surface spec data"""
-        return self._get_property(["data", "spec"])
+        return self._get_property(("data", "spec"))
 
     @property
     def timestamp(self) -> str:
         """Surface timestmap data"""
-        t0 = self._get_property(["data", "time", "t0", "value"])
-        t1 = self._get_property(["data", "time", "t1", "value"])
+        t0 = self._get_property(("data", "time", "t0", "value"))
+        t1 = self._get_property(("data", "time", "t1", "value"))
 
         if t0 is not None and t1 is None:
             return t0
@@ -31,8 +34,8 @@ class Surface(Child):
     @property
     def interval(self) -> str:
         """Surface interval data"""
-        t0 = self._get_property(["data", "time", "t0", "value"])
-        t1 = self._get_property(["data", "time", "t1", "value"])
+        t0 = self._get_property(("data", "time", "t0", "value"))
+        t1 = self._get_property(("data", "time", "t1", "value"))
 
         if t0 is not None and t1 is not None:
             return (t0, t1)
@@ -42,10 +45,13 @@ class Surface(Child):
     def to_regular_surface(self) -> RegularSurface:
         """Get surface object as a RegularSurface
 
+        IRAP binary surfaces are decoded directly from the blob, and other
+        formats are read with xtgeo.
+
         Returns:
             RegularSurface: A RegularSurface object
         """
         try:
-            return surface_from_file(self.blob)
+            return surface_from_blob(self.blob.getbuffer())
         except TypeError as type_err:
             raise TypeError(f"Unknown format: {self.format}") from type_err
@@ -1,12 +1,34 @@
 """Module containing class for collection of surfaces"""
-from typing import Union, List, Dict, Tuple
+from typing import Any, Union, List, Dict, Tuple, Iterator, Callable
 from io import BytesIO
+from collections import deque
+import multiprocessing
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import numpy as np
 import xtgeo
 from sumo.wrapper import SumoClient
 from fmu.sumo.explorer.objects._child_collection import ChildCollection
 from fmu.sumo.explorer.objects.surface import Surface
 from fmu.sumo.explorer.timefilter import TimeFilter
 from fmu.sumo.explorer.pit import Pit
+from fmu.sumo.explorer._irap import (
+    surface_from_blob,
+    read_values_into,
+    _GRID,
+)
+from fmu.sumo.explorer._statistics import (
+    StreamingStatistics,
+    check_operations,
+    stack_statistics,
+)
+
+# operations whose results for chunks of surfaces can be merged exactly
+# without the number of defined values per cell, which Sumo does not return
+_MERGEABLE_OPERATIONS = ("min", "max")
+
+# operations which can be computed locally one surface at a time
+_STREAMING = ("mean", "min", "max", "std")
 
 TIMESTAMP_QUERY = {
     "bool": {
@@ -16,8 +38,99 @@ TIMESTAMP_QUERY = {
 }
 
 
+def _cache_key(operation: str, backend: str):
+    """Get key of aggregated surface in the aggregation caches"""
+    return operation if backend == "sumo" else ("local", operation)
+
+
+def _get_blob_md5(hit: Dict) -> str:
+    return hit.get("_source", {}).get("_sumo", {}).get("blob_md5")
+
+
+def _to_irap(surface: xtgeo.RegularSurface) -> bytes:
+    buf = BytesIO()
+    surface.to_file(buf, fformat="irap_binary")
+
+    return buf.getvalue()
+
+
+def _decode(surface: Surface) -> xtgeo.RegularSurface:
+    """Download and decode surface, without keeping the blob"""
+    return surface_from_blob(surface._get_blob())
+
+
+def _process_context():
+    """Get context starting decode processes without forking threads"""
+    methods = multiprocessing.get_all_start_methods()
+    method = "forkserver" if "forkserver" in methods else "spawn"
+
+    return multiprocessing.get_context(method)
+
+
+def _decode_shared(
+    blob: bytes, name: str, shape: Tuple, dtype: str, index: int
+) -> Tuple:
+    """Decode surface into a stack in shared memory, in a worker process
+
+    Returns:
+        Tuple: the grid of the surface
+    """
+    # shared_memory requires Python 3.8
+    from multiprocessing import shared_memory
+
+    shared = shared_memory.SharedMemory(name=name)
+    stack = np.ndarray(shape, dtype, buffer=shared.buf)
+    grid = read_values_into(blob, stack[index])
+
+    # the shared memory can only be closed when no array uses it
+    del stack
+    shared.close()
+
+    return grid
+
+
+def _load_values(surface: Surface, shape: Tuple, dtype) -> np.ndarray:
+    """Download and decode the values of a surface, NaN where undefined"""
+    values = np.empty(shape, dtype)
+    read_values_into(surface._get_blob(), values)
+
+    return values
+
+
+def _check_grids(grids: List[Tuple]) -> None:
+    """Check that surfaces are on the same grid
+
+    Raises:
+        ValueError: if the surfaces are not on the same grid
+    """
+    if any(grid != grids[0] for grid in grids):
+        raise ValueError("Surfaces are not on the same grid")
+
+
 class SurfaceCollection(ChildCollection):
-    """Class representing a collection of surface objects in Sumo"""
+    """Class representing a collection of surface objects in Sumo
+
+    Minimum and maximum of more than `aggregation_chunk_size` surfaces
+    are split into chunks, which are aggregated concurrently by
+    `aggregation_workers` requests and merged. Mean, standard deviation
+    and percentiles can not be merged exactly, and are always aggregated
+    in one request.
+
+    With `backend="local"`, the statistics are computed locally instead,
+    from surfaces downloaded by `local_workers` concurrent requests. The
+    stacked values of all surfaces may use up to `local_memory_budget`
+    bytes. Larger collections are aggregated one surface at a time, which
+    supports mean, std, min and max only.
+
+    With `decoder="process"`, `to_numpy` decodes surfaces in
+    `decode_processes` worker processes, by default one per CPU.
+    """
+
+    aggregation_chunk_size = 1000
+    aggregation_workers = 4
+    local_memory_budget = 2 * 1024**3
+    local_workers = 8
+    decode_processes = None
 
     def __init__(
         self,
@@ -37,8 +150,7 @@ class SurfaceCollection(ChildCollection):
 
         self._aggregation_cache = {}
 
-    def __getitem__(self, index) -> Surface:
-        doc = super().__getitem__(index)
+    def _make_object(self, doc: Dict) -> Surface:
         return Surface(self._sumo, doc)
 
     @property
@@ -82,21 +194,492 @@ class SurfaceCollection(ChildCollection):
 
         return intervals
 
-    def _aggregate(self, operation: str) -> xtgeo.RegularSurface:
-        if operation not in self._aggregation_cache:
-            objects = self._utils.get_objects(500, self._query, ["_id"])
-            object_ids = list(map(lambda obj: obj["_id"], objects))
+    def _aggregate(
+        self, operation: str, backend: str = "sumo"
+    ) -> xtgeo.RegularSurface:
+        return self.statistics([operation], backend)[operation]
+
+    def statistics(
+        self, operations: List[str], backend: str = "sumo"
+    ) -> Dict[str, xtgeo.RegularSurface]:
+        """Perform several aggregations at once
+
+        The operations are aggregated concurrently, by up to
+        `aggregation_workers` requests to Sumo, one per operation. The
+        results are cached, so the methods for each operation, such as
+        `mean`, return them without further requests.
+
+        Args:
+            operations (List[str]): mean, min, max, std, p10, p50 or p90
+            backend (str): "sumo" to aggregate in Sumo, or "local"
+
+        Returns:
+            Dict[str, RegularSurface]: aggregated surface per operation
+
+        Example::
+
+            stats = surfs.statistics(["mean", "std", "p10", "p50", "p90"])
+            mean = stats["mean"]
+        """
+        check_operations(operations)
+
+        if backend not in ("sumo", "local"):
+            raise ValueError(f"Invalid backend: {backend}")
+
+        keys = {op: _cache_key(op, backend) for op in operations}
+        missing = [
+            op for op in operations if keys[op] not in self._aggregation_cache
+        ]
+
+        if missing:
+            self._aggregate_missing(missing, backend)
+
+        return {op: self._aggregation_cache[keys[op]] for op in operations}
+
+    def _aggregate_missing(self, operations: List[str], backend: str):
+        """Aggregate operations, using the aggregation cache of the client
+
+        The client's cache is shared by every collection of the Explorer,
+        and is keyed by the uuids and blob checksums of the surfaces, so
+        it is invalidated when the surfaces change.
+
+        Args:
+            operations (List[str]): operations not in the collection cache
+            backend (str): "sumo" or "local"
+        """
+        shared = getattr(self._sumo, "aggregation_cache", None)
+        objects = None
+
+        if shared is not None or backend == "sumo":
+            objects = self._get_object_checksums()
+
+        if shared is not None:
+            for operation in list(operations):
+                key = _cache_key(operation, backend)
+                blob = shared.get(f"{backend}:{operation}", objects)
+
+                if blob is not None:
+                    surface = surface_from_blob(blob)
+                    self._aggregation_cache[key] = surface
+                    operations.remove(operation)
+
+            if len(operations) == 0:
+                return
+
+        if backend == "local":
+            self._aggregate_local(operations)
+        else:
+            self._aggregate_sumo(operations, [uuid for uuid, _ in objects])
+
+        if shared is not None:
+            for operation in operations:
+                key = _cache_key(operation, backend)
+                blob = _to_irap(self._aggregation_cache[key])
+                shared.put(f"{backend}:{operation}", objects, blob)
+
+    def _aggregate_sumo(self, operations: List[str], object_ids: List[str]):
+        """Aggregate operations in Sumo, and cache the results
+
+        Args:
+            operations (List[str]): aggregation operations
+            object_ids (List[str]): uuids of surfaces to aggregate
+        """
+        if len(object_ids) > self.aggregation_chunk_size:
+            mergeable = [
+                op for op in operations if op in _MERGEABLE_OPERATIONS
+            ]
+
+            if mergeable:
+                self._aggregate_chunked(mergeable, object_ids)
 
-            res = self._sumo.post(
-                "/aggregate",
-                json={"operation": [operation], "object_ids": object_ids},
+            operations = [op for op in operations if op not in mergeable]
+
+        if operations:
+            self._aggregation_cache.update(
+                self._aggregate_objects(operations, object_ids)
             )
 
-            self._aggregation_cache[operation] = xtgeo.surface_from_file(
-                BytesIO(res.content)
+    def _get_object_checksums(self) -> List[Tuple[str, str]]:
+        """Get the uuid and blob checksum of every surface in the collection"""
+        return [
+            (hit["_id"], _get_blob_md5(hit))
+            for batch in self._batch_source(select=["_sumo.blob_md5"])
+            for hit in batch
+        ]
+
+    def _aggregate_objects(
+        self, operations: List[str], object_ids: List[str]
+    ) -> Dict[str, xtgeo.RegularSurface]:
+        """Aggregate surfaces in Sumo, one request per operation
+
+        Args:
+            operations (List[str]): aggregation operations
+            object_ids (List[str]): uuids of surfaces to aggregate
+
+        Returns:
+            Dict[str, RegularSurface]: aggregated surface per operation
+        """
+        if len(operations) == 1:
+            return {
+                operations[0]: self._aggregate_operation(
+                    operations[0], object_ids
+                )
+            }
+
+        def aggregate(operation):
+            return self._aggregate_operation(operation, object_ids)
+
+        workers = min(len(operations), self.aggregation_workers)
+
+        with ThreadPoolExecutor(workers) as executor:
+            return dict(zip(operations, executor.map(aggregate, operations)))
+
+    def _aggregate_operation(
+        self, operation: str, object_ids: List[str]
+    ) -> xtgeo.RegularSurface:
+        """Aggregate surfaces in Sumo for one operation
+
+        Args:
+            operation (str): aggregation operation
+            object_ids (List[str]): uuids of surfaces to aggregate
+
+        Returns:
+            RegularSurface: the aggregated surface
+        """
+        res = self._sumo.post(
+            "/aggregate",
+            json={"operation": [operation], "object_ids": object_ids},
+        )
+
+        return surface_from_blob(res.content)
+
+    def _aggregate_chunked(
+        self, operations: List[str], object_ids: List[str]
+    ) -> None:
+        """Aggregate chunks of surfaces concurrently, and merge the results
+
+        Every chunk is aggregated in one request per operation. The
+        results are cached.
+
+        Args:
+            operations (List[str]): min or max
+            object_ids (List[str]): uuids of surfaces to aggregate
+        """
+        size = self.aggregation_chunk_size
+        chunks = [
+            object_ids[i : i + size] for i in range(0, len(object_ids), size)
+        ]
+        requests = [(op, chunk) for chunk in chunks for op in operations]
+
+        def aggregate(request):
+            return self._aggregate_operation(*request)
+
+        with ThreadPoolExecutor(self.aggregation_workers) as executor:
+            results = list(executor.map(aggregate, requests))
+
+        partials = {}
+
+        for (op, _), surface in zip(requests, results):
+            partials.setdefault(op, []).append(surface)
+
+        for op in operations:
+            stack = np.ma.stack([surface.values for surface in partials[op]])
+            merge = np.ma.min if op == "min" else np.ma.max
+            surface = partials[op][0].copy()
+            surface.values = merge(stack, axis=0)
+            self._aggregation_cache[op] = surface
+
+    def _aggregate_local(self, operations: List[str]) -> None:
+        """Download the surfaces and compute statistics locally
+
+        The surfaces are downloaded and decoded concurrently. If their
+        values fit within `local_memory_budget` bytes, they are stacked
+        and every statistic is computed from the stack, a block of cells
+        at a time, so the temporary memory stays small compared to the
+        budget. Otherwise, mean, std, min and max are computed streaming,
+        one surface at a time.
+
+        The statistics are cached with keys ("local", operation).
+
+        Args:
+            operations (List[str]): statistics to compute
+        """
+        surfaces = list(self)
+
+        if len(surfaces) == 0:
+            raise Exception("No surfaces to aggregate")
+
+        spec = surfaces[0].spec
+        shape = (spec["ncol"], spec["nrow"])
+        streaming = (
+            len(surfaces) * shape[0] * shape[1] * 8 > self.local_memory_budget
+        )
+
+        if streaming:
+            missing = [op for op in operations if op not in _STREAMING]
+
+            if missing:
+                raise ValueError(
+                    f"Surfaces exceed the memory budget, can not compute "
+                    f"{', '.join(missing)}"
+                )
+
+            stats = StreamingStatistics(shape)
+        else:
+            stack = np.empty((len(surfaces),) + shape)
+
+        template = None
+
+        for i, surface in enumerate(self._decode_on_grid(surfaces)):
+            template = surface if template is None else template
+            values = surface.values.astype(np.float64).filled(np.nan)
+
+            if streaming:
+                stats.add(values)
+            else:
+                stack[i] = values
+
+        if streaming:
+            results = {op: stats.result(op) for op in operations}
+        else:
+            results = stack_statistics(stack, operations)
+
+        for operation, values in results.items():
+            result = template.copy()
+            result.values = values
+            self._aggregation_cache[("local", operation)] = result
+
+    def to_numpy(
+        self, dtype=np.float64, decoder: str = "thread"
+    ) -> Tuple[np.ndarray, List[int]]:
+        """Get the values of every surface, stacked in one array
+
+        The surfaces are downloaded by `local_workers` concurrent
+        requests, and decoded into an array of shape (surfaces, ncol,
+        nrow) ordered by realization. Undefined values are NaN.
+
+        With `decoder="thread"`, each surface is decoded by the thread
+        downloading it. With `decoder="process"`, the surfaces are decoded
+        by a pool of `decode_processes` processes, writing into a stack in
+        shared memory, which is copied into the returned array. Decoding
+        then scales with the number of CPUs, but the stack takes twice the
+        memory while it is copied. The processes are started with
+        forkserver, or spawn where it is not available, never by forking
+        the threads downloading the blobs. The calling script must
+        therefore guard its code with `if __name__ == "__main__":`.
+        Decoding in processes requires Python 3.8 or later.
+
+        Args:
+            dtype: float64, or float32 to halve memory use
+            decoder (str): "thread" or "process"
+
+        Returns:
+            Tuple[np.ndarray, List[int]]: the stacked values, and the
+            realization of each surface along the first axis
+
+        Raises:
+            ValueError: if the surfaces are not on the same grid
+
+        Example::
+
+            surfs = case.surfaces.filter(name="DS_extract", iteration="iter-0")
+            values, realizations = surfs.to_numpy(dtype=np.float32)
+        """
+        if decoder not in ("thread", "process"):
+            raise ValueError(f"Invalid decoder: {decoder}")
+
+        surfaces = self._by_realization()
+        spec = surfaces[0].spec
+        shape = (len(surfaces), spec["ncol"], spec["nrow"])
+
+        if decoder == "process":
+            stack = self._decode_processes(surfaces, shape, np.dtype(dtype))
+        else:
+            stack = np.empty(shape, dtype)
+
+            def decode(index: int) -> Tuple:
+                blob = surfaces[index]._get_blob()
+                return read_values_into(blob, stack[index])
+
+            with ThreadPoolExecutor(self.local_workers) as executor:
+                _check_grids(list(executor.map(decode, range(len(surfaces)))))
+
+        return stack, [surf.realization for surf in surfaces]
+
+    def to_masked_array(
+        self, dtype=np.float64, decoder: str = "thread"
+    ) -> Tuple[np.ma.MaskedArray, List[int]]:
+        """Get the values of every surface, stacked in one masked array
+
+        Like `to_numpy`, with undefined values masked instead of NaN.
+
+        Args:
+            dtype: float64, or float32 to halve memory use
+            decoder (str): "thread" or "process"
+
+        Returns:
+            Tuple[np.ma.MaskedArray, List[int]]: the stacked values, and
+            the realization of each surface along the first axis
+        """
+        stack, realizations = self.to_numpy(dtype, decoder)
+
+        return np.ma.masked_invalid(stack, copy=False), realizations
+
+    def to_dask(self, dtype=np.float64) -> Tuple[Any, List[int]]:
+        """Get the values of every surface as a lazy Dask array
+
+        The array has shape (surfaces, ncol, nrow), ordered by
+        realization, with one chunk per surface. Shapes come from the
+        metadata, and a surface is only downloaded and decoded when its
+        chunk is computed. Undefined values are NaN.
+
+        The chunks download surfaces with the client of the Explorer, so
+        they must be computed in this process, for example by the default
+        threaded scheduler. Requires dask.
+
+        Args:
+            dtype: float64, or float32 to halve memory use
+
+        Returns:
+            Tuple[dask.array.Array, List[int]]: the values, and the
+            realization of each surface along the first axis
+
+        Raises:
+            ValueError: if the metadata shows surfaces on different grids
+
+        Example::
+
+            values, realizations = surfs.to_dask(dtype=np.float32)
+            mean = values.mean(axis=0).compute()
+        """
+        try:
+            import dask
+            import dask.array as da
+        except ImportError as import_err:
+            raise ImportError(
+                "to_dask requires dask, install it with "
+                "pip install fmu-sumo[dask]"
+            ) from import_err
+
+        surfaces = self._by_realization()
+        specs = [surf.spec for surf in surfaces]
+        _check_grids(
+            [tuple(spec.get(key) for key in _GRID) for spec in specs]
+        )
+
+        shape = (specs[0]["ncol"], specs[0]["nrow"])
+        chunks = [
+            da.from_delayed(
+                dask.delayed(_load_values)(surface, shape, dtype),
+                shape=shape,
+                dtype=dtype,
             )
+            for surface in surfaces
+        ]
+
+        return da.stack(chunks), [surf.realization for surf in surfaces]
+
+    def _by_realization(self) -> List[Surface]:
+        """Get the surfaces of the collection ordered by realization"""
+        surfaces = sorted(
+            self, key=lambda surf: (surf.realization is None, surf.realization)
+        )
+
+        if len(surfaces) == 0:
+            raise Exception("No surfaces in collection")
+
+        return surfaces
+
+    def _decode_processes(
+        self, surfaces: List[Surface], shape: Tuple, dtype: np.dtype
+    ) -> np.ndarray:
+        """Decode surfaces in worker processes, into a stack in shared memory
+
+        The blobs are downloaded concurrently, and passed to the workers as
+        they arrive. At most twice `decode_processes` blobs wait for a
+        worker at a time.
+        """
+        # shared_memory requires Python 3.8
+        from multiprocessing import shared_memory
+
+        processes = self.decode_processes or os.cpu_count()
+        size = int(np.prod(shape)) * dtype.itemsize
+        shared = shared_memory.SharedMemory(create=True, size=max(size, 1))
+
+        try:
+            grids = []
+            pending = deque()
+
+            with ProcessPoolExecutor(
+                processes, mp_context=_process_context()
+            ) as executor:
+                blobs = self._map_surfaces(Surface._get_blob, surfaces)
+
+                for index, blob in enumerate(blobs):
+                    pending.append(
+                        executor.submit(
+                            _decode_shared,
+                            blob,
+                            shared.name,
+                            shape,
+                            dtype.str,
+                            index,
+                        )
+                    )
+
+                    if len(pending) >= 2 * processes:
+                        grids.append(pending.popleft().result())
+
+                grids.extend(future.result() for future in pending)
+
+            _check_grids(grids)
+
+            return np.ndarray(shape, dtype, buffer=shared.buf).copy()
+        finally:
+            shared.close()
+            shared.unlink()
+
+    def _decode_on_grid(
+        self, surfaces: List[Surface]
+    ) -> Iterator[xtgeo.RegularSurface]:
+        """Decode surfaces concurrently, checking that they are on the
+        grid of the first
+
+        Raises:
+            ValueError: if the surfaces are not on the same grid
+        """
+        template = None
+
+        for surface in self._map_surfaces(_decode, surfaces):
+            if template is None:
+                template = surface
+            elif not template.compare_topology(surface, strict=False):
+                raise ValueError("Surfaces are not on the same grid")
+
+            yield surface
+
+    def _map_surfaces(
+        self, function: Callable, surfaces: List[Surface]
+    ) -> Iterator:
+        """Apply function, such as download and decode, to surfaces
+        concurrently, keeping their order
+
+        At most twice `local_workers` surfaces are in flight, so results
+        do not pile up when they are consumed slowly.
+        """
+        window = 2 * self.local_workers
+
+        with ThreadPoolExecutor(self.local_workers) as executor:
+            pending = deque()
+
+            for surface in surfaces:
+                pending.append(executor.submit(function, surface))
+
+                if len(pending) >= window:
+                    yield pending.popleft().result()
 
-        return self._aggregation_cache[operation]
+            while pending:
+                yield pending.popleft().result()
 
     def filter(
         self,
@@ -180,30 +763,58 @@ class SurfaceCollection(ChildCollection):
 
         return SurfaceCollection(self._sumo, self._case_uuid, query, self._pit)
 
-    def mean(self) -> xtgeo.RegularSurface:
-        """Perform a mean aggregation"""
-        return self._aggregate("mean")
+    def mean(self, backend: str = "sumo") -> xtgeo.RegularSurface:
+        """Perform a mean aggregation
 
-    def min(self) -> xtgeo.RegularSurface:
-        """Perform a minimum aggregation"""
-        return self._aggregate("min")
+        Args:
+            backend (str): "sumo" to aggregate in Sumo, or "local"
+        """
+        return self._aggregate("mean", backend)
+
+    def min(self, backend: str = "sumo") -> xtgeo.RegularSurface:
+        """Perform a minimum aggregation
 
-    def max(self) -> xtgeo.RegularSurface:
-        """Perform a maximum aggregation"""
-        return self._aggregate("max")
+        Args:
+            backend (str): "sumo" to aggregate in Sumo, or "local"
+        """
+        return self._aggregate("min", backend)
 
-    def std(self) -> xtgeo.RegularSurface:
-        """Perform a standard deviation aggregation"""
-        return self._aggregate("std")
+    def max(self, backend: str = "sumo") -> xtgeo.RegularSurface:
+        """Perform a maximum aggregation
 
-    def p10(self) -> xtgeo.RegularSurface:
-        """Perform a percentile aggregation"""
-        return self._aggregate("p10")
+        Args:
+            backend (str): "sumo" to aggregate in Sumo, or "local"
+        """
+        return self._aggregate("max", backend)
+
+    def std(self, backend: str = "sumo") -> xtgeo.RegularSurface:
+        """Perform a standard deviation aggregation
+
+        Args:
+            backend (str): "sumo" to aggregate in Sumo, or "local"
+        """
+        return self._aggregate("std", backend)
 
-    def p50(self) -> xtgeo.RegularSurface:
-        """Perform a percentile aggregation"""
-        return self._aggregate("p50")
+    def p10(self, backend: str = "sumo") -> xtgeo.RegularSurface:
+        """Perform a percentile aggregation
 
-    def p90(self) -> xtgeo.RegularSurface:
-        """Perform a percentile aggregation"""
-        return self._aggregate("p90")
+        Args:
+            backend (str): "sumo" to aggregate in Sumo, or "local"
+        """
+        return self._aggregate("p10", backend)
+
+    def p50(self, backend: str = "sumo") -> xtgeo.RegularSurface:
+        """Perform a percentile aggregation
+
+        Args:
+            backend (str): "sumo" to aggregate in Sumo, or "local"
+        """
+        return self._aggregate("p50", backend)
+
+    def p90(self, backend: str = "sumo") -> xtgeo.RegularSurface:
+        """Perform a percentile aggregation
+
+        Args:
+            backend (str): "sumo" to aggregate in Sumo, or "local"
+        """
+        return self._aggregate("p90", backend)
@@ -11,6 +11,8 @@ from warnings import warn
 class Table(Child):
     """Class representing a table object in Sumo"""
 
+    __slots__ = ("_dataframe", "_arrowtable")
+
     def __init__(self, sumo: SumoClient, metadata: dict) -> None:
         """
         Args:
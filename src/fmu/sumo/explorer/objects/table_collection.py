@@ -25,8 +25,7 @@ class TableCollection(ChildCollection):
         """
         super().__init__("table", sumo, case_uuid, query, pit)
 
-    def __getitem__(self, index) -> Table:
-        doc = super().__getitem__(index)
+    def _make_object(self, doc: Dict) -> Table:
         return Table(self._sumo, doc)
 
     @property
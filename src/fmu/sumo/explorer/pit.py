@@ -1,21 +1,108 @@
 """Module containing class for pit handling"""
 from typing import Dict
+from warnings import warn
+import re
+import threading
 from sumo.wrapper import SumoClient
 
+_UNITS = {
+    "d": 86400,
+    "h": 3600,
+    "m": 60,
+    "s": 1,
+    "ms": 1e-3,
+    "micros": 1e-6,
+    "nanos": 1e-9,
+}
+
+
+def _parse_keep_alive(keep_alive: str) -> float:
+    """Get the number of seconds in a keep_alive value, e.g. 15m
+
+    Units are case insensitive, as in Elasticsearch.
+    """
+    match = re.fullmatch(
+        r"(\d+)(d|h|m|s|ms|micros|nanos)", keep_alive.strip().lower()
+    )
+
+    if match is None:
+        raise ValueError(f"Invalid keep_alive: {keep_alive}")
+
+    return int(match.group(1)) * _UNITS[match.group(2)]
+
 
 class Pit:
-    """Class for handling of pit"""
+    """Class for handling of pit
+
+    The pit is deleted in Sumo when it is closed, either explicitly or
+    by using it as a context manager::
+
+        with Pit(sumo, "5m") as pit:
+            ...
+
+    With `auto_renew`, a background thread extends the lifetime of the pit
+    at half the `keep_alive` interval until it is closed, so long pauses
+    between requests do not make it expire.
 
-    def __init__(self, sumo: SumoClient, keep_alive: str) -> None:
+    The pit is thread safe, and is shared by all collections and slices
+    created with it.
+    """
+
+    def __init__(
+        self,
+        sumo: SumoClient,
+        keep_alive: str,
+        slices: int = 1,
+        auto_renew: bool = False,
+    ) -> None:
         """Init
 
         Args:
             sumo (SumoClient): Activated sumo client
             keep_alive (str): how long to keep instance alive
+            slices (int): number of slices to fetch concurrently when
+                paging through collections
+            auto_renew (bool): extend the lifetime of the pit in the
+                background until it is closed
         """
+        if slices < 1:
+            raise ValueError(f"Invalid number of slices: {slices}")
+
+        if auto_renew:
+            # keep_alive is otherwise only passed on to and checked by Sumo
+            interval = _parse_keep_alive(keep_alive) / 2
+
         self._sumo = sumo
         self._keep_alive = keep_alive
+        self._slices = slices
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
         self._pit_id = self.__get_pit_id(keep_alive)
+        self._pit_ids = {self._pit_id}
+        self._renewer = None
+
+        if auto_renew:
+            self._renewer = threading.Thread(
+                target=self.__renew_loop, args=(interval,), daemon=True
+            )
+            self._renewer.start()
+
+    def __enter__(self) -> "Pit":
+        return self
+
+    def __exit__(self, *_) -> bool:
+        self.close()
+        return False
+
+    @property
+    def slices(self) -> int:
+        """Number of slices to fetch concurrently"""
+        return self._slices
+
+    @property
+    def closed(self) -> bool:
+        """True if the pit has been closed"""
+        return self._closed.is_set()
 
     def __get_pit_id(self, keep_alive) -> str:
         res = self._sumo.post("/pit", params={"keep-alive": keep_alive})
@@ -27,4 +114,61 @@ class Pit:
         Returns:
             Dict: dict with id and info about how long to keep alive
         """
-        return {"id": self._pit_id, "keep_alive": self._keep_alive}
+        if self.closed:
+            raise Exception("Point in time is closed")
+
+        with self._lock:
+            return {"id": self._pit_id, "keep_alive": self._keep_alive}
+
+    def update(self, pit_id: str) -> None:
+        """Update the pit id from a search response
+
+        Sumo may return a new pit id with every response, which should be
+        used in subsequent requests.
+
+        Args:
+            pit_id (str): pit id returned by Sumo
+        """
+        if pit_id is None:
+            return
+
+        with self._lock:
+            self._pit_id = pit_id
+            self._pit_ids.add(pit_id)
+
+    def renew(self) -> None:
+        """Extend the lifetime of the pit by `keep_alive`"""
+        query = {"size": 0, "pit": self.get_pit_object()}
+        res = self._sumo.post("/search", json=query).json()
+        self.update(res.get("pit_id"))
+
+    def close(self) -> None:
+        """Delete the pit in Sumo, and stop renewing it
+
+        Responses to queries against the pit are dropped from the query
+        cache of the client, if any. Closing a pit more than once has no
+        effect.
+        """
+        with self._lock:
+            if self._closed.is_set():
+                return
+
+            self._closed.set()
+
+        if self._renewer is not None:
+            self._renewer.join()
+
+        self._sumo.delete("/pit", params={"id": self._pit_id})
+
+        query_cache = getattr(self._sumo, "query_cache", None)
+
+        if query_cache is not None:
+            query_cache.discard_pit(self._pit_ids)
+
+    def __renew_loop(self, interval: float) -> None:
+        while not self._closed.wait(interval):
+            try:
+                self.renew()
+            except Exception as err:  # pylint: disable=broad-except
+                if not self.closed:
+                    warn(f"Failed to renew point in time: {err}")
@@ -7,16 +7,27 @@ def add_path():
     """Way to add package path to sys.path for testing"""
     # Adapted from https://docs.python-guide.org/writing/structure/
     # Turned into function because the details here didn't work
-    package_path = str(Path(__file__).parent.absolute() / "../src/")
-    while package_path in sys.path:
-        sys.path.remove(package_path)
-    sys.path.insert(0, package_path)
+    # The benchmarks hold the fake Sumo used by the offline tests
+    for folder in ("../benchmarks/", "../src/"):
+        package_path = str(Path(__file__).parent.absolute() / folder)
+        while package_path in sys.path:
+            sys.path.remove(package_path)
+        sys.path.insert(0, package_path)
 
 
 add_path()
 
-from fmu.sumo.explorer import Explorer
+from fmu.sumo.explorer import (
+    Explorer,
+    QueryCache,
+    BlobCache,
+    AggregationCache,
+    LatencyAggregator,
+    ReplayClient,
+    RecordingClient,
+)
 from fmu.sumo.explorer._utils import Utils
+from fmu.sumo.explorer._irap import read_irap, read_values_into
 from fmu.sumo.explorer.objects._document import Document
 from fmu.sumo.explorer.objects._document_collection import DocumentCollection
 from fmu.sumo.explorer.objects.case import Case
@@ -27,3 +38,5 @@ from fmu.sumo.explorer.objects.polygons import Polygons
 from fmu.sumo.explorer.objects.polygons_collection import PolygonsCollection
 from fmu.sumo.explorer.objects.table import Table
 from fmu.sumo.explorer.objects.table_collection import TableCollection
+from fake_sumo import FakeSumo, CASE_UUID as FAKE_CASE_UUID, WELL_KNOWN
+from fake_sumo import wrapper_client
@@ -1,19 +1,36 @@
 """Tests explorer"""
 import logging
+from io import BytesIO
 import json
+import os
 from pathlib import Path
 from uuid import UUID
 import pytest
-from xtgeo import RegularSurface
+import numpy as np
+import pyarrow as pa
+from xtgeo import RegularSurface, surface_from_file
 from context import (
     Explorer,
+    QueryCache,
+    BlobCache,
+    AggregationCache,
+    LatencyAggregator,
+    ReplayClient,
+    RecordingClient,
     Utils,
+    read_irap,
+    read_values_into,
     Case,
     CaseCollection,
+    Surface,
     SurfaceCollection,
+    FakeSumo,
+    FAKE_CASE_UUID,
+    WELL_KNOWN,
+    wrapper_client,
 )
 
-from sumo.wrapper import SumoClient
+from sumo.wrapper import SumoClient, sumo_client
 
 
 TEST_DATA = Path("data")
@@ -53,6 +70,43 @@ def fixture_test_case(explorer: Explorer, case_name: str) -> Case:
     return explorer.cases.filter(name=case_name)[0]
 
 
+@pytest.fixture(name="fake")
+def fixture_fake() -> FakeSumo:
+    """Returns in-process fake Sumo serving a synthetic case"""
+    return FakeSumo(realizations=6, surfaces=2, tables=1)
+
+
+@pytest.fixture(name="fake_sumo")
+def fixture_fake_sumo(fake: FakeSumo, monkeypatch) -> SumoClient:
+    """Returns SumoClient sending its requests to the fake Sumo, without
+    network or credentials"""
+    # wrapper_client replaces the well-known configuration of the wrapper
+    monkeypatch.setattr(sumo_client, "well_known", WELL_KNOWN)
+
+    return wrapper_client(fake)
+
+
+@pytest.fixture(name="fake_case")
+def fixture_fake_case(fake_sumo: SumoClient) -> Case:
+    """Returns the synthetic case of the fake Sumo"""
+    return Explorer(sumo=fake_sumo).get_case_by_uuid(FAKE_CASE_UUID)
+
+
+@pytest.fixture(name="ensemble", params=["test_case", "fake_case"])
+def fixture_ensemble(request) -> SurfaceCollection:
+    """Returns one surface per realization, of the first name, tagname and
+    iteration, in the dev case and in the case of the fake Sumo"""
+    case = request.getfixturevalue(request.param)
+    surfs = case.surfaces.filter(stage="realization")
+    surfs = surfs.filter(name=surfs.names[0], iteration=surfs.iterations[0])
+    surfs = surfs.filter(tagname=surfs.tagnames[0])
+    realizations = [surf.realization for surf in surfs]
+
+    assert len(set(realizations)) == len(realizations)
+
+    return surfs
+
+
 @pytest.fixture(name="sumo_client")
 def fixture_sumo_client():
     """Returns SumoClient for dev env"""
@@ -243,6 +297,55 @@ def test_case_surfaces_filter(test_case: Case):
     assert isinstance(real_surfs[0].to_regular_surface(), RegularSurface)
 
 
+def test_surface_to_regular_surface(test_case: Case):
+    """Test that decoding the blob gives the surface read by xtgeo"""
+    surf = test_case.surfaces[0]
+    actual = surf.to_regular_surface()
+    expected = surface_from_file(surf.blob)
+
+    assert actual.compare_topology(expected)
+    assert np.ma.allclose(actual.values, expected.values)
+    assert (actual.values.mask == expected.values.mask).all()
+
+
+def _irap_with_large_values() -> bytes:
+    """IRAP binary surface with values above 1e7, the RMS undefined value,
+    and undefined cells"""
+    values = np.ma.masked_invalid(np.full((4, 3), 2.5e7))
+    values[0, 1] = 3.5e8
+    values[1, 0] = 9999900.0
+    values[2, 2] = np.ma.masked
+    surface = RegularSurface(ncol=4, nrow=3, xinc=1, yinc=1, values=values)
+    buf = BytesIO()
+    surface.to_file(buf, fformat="irap_binary")
+
+    return buf.getvalue()
+
+
+def test_read_irap_large_values():
+    """Test that values are masked as when read by xtgeo"""
+    blob = _irap_with_large_values()
+    actual = read_irap(blob)
+    expected = surface_from_file(BytesIO(blob))
+
+    assert actual.compare_topology(expected)
+    assert np.ma.allclose(actual.values, expected.values)
+    assert (actual.values.mask == expected.values.mask).all()
+    assert actual.values.mask.sum() == 1
+
+
+def test_read_values_into_large_values():
+    """Test that large values are kept when decoding into an array"""
+    blob = _irap_with_large_values()
+    expected = surface_from_file(BytesIO(blob)).values.filled(np.nan)
+
+    for dtype in (np.float64, np.float32):
+        out = np.empty((4, 3), dtype)
+        read_values_into(blob, out)
+
+        assert np.array_equal(out, expected.astype(dtype), equal_nan=True)
+
+
 def test_case_surfaces_pagination(test_case: Case):
     """Test the pagination logic of SurfaceCollection (DocumentCollection)"""
     surfs = test_case.surfaces
@@ -254,6 +357,313 @@ def test_case_surfaces_pagination(test_case: Case):
     assert count == len(surfs)
 
 
+def test_case_surfaces_prefetch(test_case: Case):
+    """Test that prefetching batches yields the same documents"""
+    surfs = test_case.surfaces
+    uuids = [surf.uuid for surf in surfs]
+    prefetched = [surf.uuid for surf in test_case.surfaces.prefetch(2)]
+
+    assert prefetched == uuids
+
+
+def test_case_surfaces_stream(test_case: Case):
+    """Test that streaming yields typed objects without keeping them"""
+    surfs = test_case.surfaces
+    streamed = list(surfs.stream())
+
+    assert len(streamed) == len(surfs)
+    assert all(isinstance(surf, Surface) for surf in streamed)
+    assert len(surfs._items) == 0
+
+
+def test_fake_case_surfaces_pagination(fake_case: Case):
+    """Test paging, prefetching and streaming without Sumo"""
+    surfs = fake_case.surfaces
+    uuids = [surf.uuid for surf in surfs]
+
+    assert len(uuids) == len(surfs) == 24
+    assert len(set(uuids)) == len(uuids)
+    assert [surf.uuid for surf in fake_case.surfaces.prefetch(2)] == uuids
+    assert [surf.uuid for surf in fake_case.surfaces.stream()] == uuids
+
+
+def test_case_surfaces_sliced(token: str, case_uuid: str):
+    """Test that sliced paging returns every document exactly once"""
+    sliced = Explorer("dev", token=token, keep_alive="5m", slices=3)
+    surfs = sliced.get_case_by_uuid(case_uuid).surfaces
+    uuids = [surf.uuid for surf in surfs]
+
+    assert len(uuids) == len(surfs)
+    assert len(set(uuids)) == len(uuids)
+
+
+def test_case_surfaces_sliced_resumed(token: str, case_uuid: str):
+    """Test that a sliced iteration resumed after prefetch returns every
+    document exactly once"""
+    sliced = Explorer("dev", token=token, keep_alive="5m", slices=3)
+    surfs = sliced.get_case_by_uuid(case_uuid).surfaces
+    documents = iter(surfs)
+    uuids = [next(documents).uuid for _ in range(min(len(surfs), 600))]
+
+    surfs.prefetch(2)
+    uuids.extend(surf.uuid for surf in documents)
+
+    assert len(uuids) == len(surfs)
+    assert len(set(uuids)) == len(uuids)
+
+
+def test_fake_case_surfaces_sliced(fake: FakeSumo, fake_sumo: SumoClient):
+    """Test sliced paging, resumed after prefetch, and closing the point
+    in time without Sumo"""
+    surfs = Explorer(sumo=fake_sumo).get_case_by_uuid(FAKE_CASE_UUID)
+    expected = {surf.uuid for surf in surfs.surfaces}
+
+    with Explorer(sumo=fake_sumo, keep_alive="1m", slices=3) as sliced:
+        surfs = sliced.get_case_by_uuid(FAKE_CASE_UUID).surfaces
+        documents = iter(surfs)
+        uuids = [next(documents).uuid for _ in range(10)]
+
+        surfs.prefetch(2)
+        uuids.extend(surf.uuid for surf in documents)
+
+    assert len(uuids) == len(expected)
+    assert set(uuids) == expected
+    assert len(fake._pits) == 0
+
+
+def test_pit_close(token: str, case_uuid: str):
+    """Test that the point in time is usable until the explorer is closed"""
+    explorer = Explorer("dev", token=token, keep_alive="1m", auto_renew=True)
+
+    with explorer as sumo:
+        surfs = sumo.get_case_by_uuid(case_uuid).surfaces
+        assert len(surfs) > 0
+
+    assert sumo._pit.closed
+
+    with pytest.raises(Exception):
+        len(sumo.get_case_by_uuid(case_uuid).surfaces)
+
+    sumo.close()
+
+
+def test_explorer_slices_without_pit():
+    """Test that slices are refused without a point in time"""
+    with pytest.raises(ValueError, match="keep_alive"):
+        Explorer(sumo=object(), slices=4)
+
+
+def test_pit_keep_alive():
+    """Test that keep_alive is passed on to Sumo as given, and only
+    parsed when the point in time is renewed"""
+
+    class Response:
+        def json(self):
+            return {"id": "pit"}
+
+    class Client:
+        def __init__(self):
+            self.keep_alive = []
+
+        def post(self, path: str, json=None, params=None):
+            self.keep_alive.append(params["keep-alive"])
+            return Response()
+
+        def delete(self, path: str, params=None):
+            return Response()
+
+    client = Client()
+
+    with Explorer(sumo=client, keep_alive="1H"):
+        pass
+
+    with Explorer(sumo=client, keep_alive="1H", auto_renew=True):
+        pass
+
+    assert client.keep_alive == ["1H", "1H"]
+
+    with pytest.raises(ValueError, match="keep_alive"):
+        Explorer(sumo=client, keep_alive="1 hour", auto_renew=True)
+
+
+def test_surfaces_aggregate_chunked(ensemble: SurfaceCollection):
+    """Test that aggregating min and max in chunks gives the same result as
+    one request, and that mean and std are not affected by chunking"""
+    surfs = ensemble
+    chunked = surfs.filter()
+    chunked.aggregation_chunk_size = max(len(surfs) // 3, 1)
+
+    for operation in ("mean", "std", "min", "max"):
+        expected = surfs._aggregate(operation).values
+        actual = chunked._aggregate(operation).values
+
+        assert np.ma.allclose(actual, expected, rtol=1e-4)
+
+
+def test_surfaces_to_numpy(ensemble: SurfaceCollection):
+    """Test stacking the values of every surface in one array"""
+    surfs = ensemble
+    values, realizations = surfs.to_numpy(dtype=np.float32)
+
+    assert values.shape[0] == len(surfs) == len(realizations)
+    assert values.dtype == np.float32
+    assert realizations == sorted(set(realizations))
+
+    (surf,) = surfs.filter(realization=realizations[0])
+    masked, _ = surfs.to_masked_array()
+
+    assert np.ma.allclose(masked[0], surf.to_regular_surface().values)
+
+
+def test_surfaces_to_numpy_processes(ensemble: SurfaceCollection):
+    """Test that decoding in processes gives the values decoded in threads"""
+    surfs = ensemble
+    surfs.decode_processes = 2
+
+    expected, realizations = surfs.to_numpy()
+    actual, actual_realizations = surfs.to_numpy(decoder="process")
+
+    assert actual_realizations == realizations
+    assert np.array_equal(actual, expected, equal_nan=True)
+
+    with pytest.raises(ValueError):
+        surfs.to_numpy(decoder="invalid")
+
+
+def test_surfaces_to_dask(ensemble: SurfaceCollection):
+    """Test that the lazy Dask array computes to the stacked values"""
+    pytest.importorskip("dask")
+
+    surfs = ensemble
+    lazy, realizations = surfs.to_dask()
+
+    assert lazy.shape[0] == len(surfs)
+    assert lazy.chunks[0] == (1,) * len(surfs)
+
+    expected, expected_realizations = surfs.to_numpy()
+
+    assert realizations == expected_realizations
+    assert np.array_equal(lazy.compute(), expected, equal_nan=True)
+
+
+def test_surfaces_statistics(ensemble: SurfaceCollection):
+    """Test that several statistics are aggregated and cached at once"""
+    surfs = ensemble
+    operations = ["mean", "std", "p10", "p50", "p90"]
+
+    stats = surfs.statistics(operations)
+
+    assert list(stats) == operations
+    assert all(stats[op] is surfs._aggregation_cache[op] for op in operations)
+    assert surfs.p50() is stats["p50"]
+
+    expected = surfs.filter().p90().values
+
+    assert np.ma.allclose(stats["p90"].values, expected)
+
+
+def test_fake_aggregation_cache(fake_sumo: SumoClient, tmp_path: Path):
+    """Test that aggregations are shared between sessions without Sumo"""
+    caches = [AggregationCache(str(tmp_path)) for _ in range(2)]
+    means = []
+
+    for cache in caches:
+        explorer = Explorer(sumo=fake_sumo, aggregation_cache=cache)
+        surfs = explorer.get_case_by_uuid(FAKE_CASE_UUID).surfaces
+        surfs = surfs.filter(name="surface_0", iteration="iter-0")
+        means.append(surfs.mean().values)
+
+    assert (caches[0].misses, caches[1].hits) == (1, 1)
+    assert np.ma.allclose(means[1], means[0])
+
+
+def test_explorer_aggregation_cache(
+    token: str, case_uuid: str, tmp_path: Path
+):
+    """Test that aggregations are shared between collections and sessions"""
+    cache = AggregationCache(str(tmp_path))
+    explorer = Explorer("dev", token=token, aggregation_cache=cache)
+    surfs = explorer.get_case_by_uuid(case_uuid).surfaces
+    surfs = surfs.filter(stage="realization")
+    name = surfs.names[0]
+    iteration = surfs.iterations[0]
+    tagname = surfs.filter(name=name).tagnames[0]
+
+    mean = surfs.filter(name=name, iteration=iteration, tagname=tagname)
+    mean = mean.mean()
+    again = surfs.filter(iteration=iteration, tagname=tagname)
+    again = again.filter(name=name).mean()
+
+    assert cache.misses == 1
+    assert cache.hits == 1
+    assert np.ma.allclose(again.values, mean.values)
+
+    session = Explorer(
+        "dev", token=token, aggregation_cache=AggregationCache(str(tmp_path))
+    )
+    surfs = session.get_case_by_uuid(case_uuid).surfaces
+    surfs = surfs.filter(stage="realization")
+    surfs = surfs.filter(name=name, iteration=iteration, tagname=tagname)
+
+    assert np.ma.allclose(surfs.mean().values, mean.values)
+    assert session._sumo.aggregation_cache.hits == 1
+
+
+def test_surfaces_aggregate_local(ensemble: SurfaceCollection):
+    """Test that local statistics match the statistics from Sumo,
+    including the percentile convention"""
+    surfs = ensemble
+    streaming = surfs.filter()
+    streaming.local_memory_budget = 0
+
+    for operation in ("mean", "std", "min", "max", "p10", "p50", "p90"):
+        expected = getattr(surfs, operation)().values
+        collections = [surfs]
+
+        if operation in ("mean", "std", "min", "max"):
+            collections.append(streaming)
+
+        for collection in collections:
+            actual = getattr(collection, operation)(backend="local").values
+
+            assert np.ma.allclose(actual, expected, rtol=1e-4)
+
+    with pytest.raises(ValueError):
+        streaming.p90(backend="local")
+
+
+def test_case_surfaces_random_access(test_case: Case):
+    """Test negative indexes, slices and jumping to distant documents"""
+    uuids = [surf.uuid for surf in test_case.surfaces]
+    surfs = test_case.surfaces
+
+    assert surfs[len(uuids) - 1].uuid == uuids[-1]
+    assert surfs[-1].uuid == uuids[-1]
+    assert [surf.uuid for surf in surfs[3:10:2]] == uuids[3:10:2]
+    assert [surf.uuid for surf in surfs[-5:]] == uuids[-5:]
+
+    with pytest.raises(IndexError):
+        surfs[-len(uuids) - 1]
+
+
+def test_fake_case_surfaces_random_access(monkeypatch):
+    """Test jumping to distant documents, keeping a bounded number of
+    jumped batches, without Sumo"""
+    monkeypatch.setattr(sumo_client, "well_known", WELL_KNOWN)
+    fake = FakeSumo(realizations=500, surfaces=5, tables=0, shape=(5, 2))
+    explorer = Explorer(sumo=wrapper_client(fake))
+    case = explorer.get_case_by_uuid(FAKE_CASE_UUID)
+    uuids = [surf.uuid for surf in case.surfaces]
+    surfs = case.surfaces
+
+    for index in range(len(uuids) - 1, 0, -499):
+        assert surfs[index].uuid == uuids[index]
+
+    assert len(surfs._jumped) == 8
+    assert surfs[-1].uuid == uuids[-1]
+    assert [surf.uuid for surf in surfs[4990::3]] == uuids[4990::3]
+
+
 def test_get_case_by_uuid(explorer: Explorer, case_uuid: str, case_name: str):
     """Test that explorer.get_case_by_uuid returns the specified case"""
     case = explorer.get_case_by_uuid(case_uuid)
@@ -263,6 +673,17 @@ def test_get_case_by_uuid(explorer: Explorer, case_uuid: str, case_name: str):
     assert case.name == case_name
 
 
+def test_get_surfaces_by_uuids(explorer: Explorer, test_case: Case):
+    """Test that surfaces are returned in the order of the uuids"""
+    uuids = [surf.uuid for surf in test_case.surfaces][:20][::-1]
+    surfs = explorer.get_surfaces_by_uuids(uuids)
+
+    assert [surf.uuid for surf in surfs] == uuids
+
+    with pytest.raises(Exception, match="not-a-uuid"):
+        explorer.get_surfaces_by_uuids(uuids + ["not-a-uuid"])
+
+
 def test_utils_extend_query_object(utils: Utils):
     """Test extension of query"""
     old = {"bool": {"must": [{"term": {"class.keyword": "surface"}}]}}
@@ -285,3 +706,295 @@ def test_utils_extend_query_object(utils: Utils):
     extended = utils.extend_query_object(extended, new)
 
     assert len(extended["bool"]["must"]) == 3
+
+
+def test_utils_extend_query_object_immutable(utils: Utils):
+    """Test that extending a query leaves both query objects unchanged"""
+    old = {"bool": {"must": [{"term": {"class.keyword": "surface"}}]}}
+    new = {
+        "bool": {
+            "must": [
+                {"term": {"class.keyword": "surface"}},
+                {"term": {"data.name.keyword": "name"}},
+            ]
+        }
+    }
+    old_json, new_json = json.dumps(old), json.dumps(new)
+    extended = utils.extend_query_object(old, new)
+
+    assert json.dumps(old) == old_json
+    assert json.dumps(new) == new_json
+    assert extended["bool"]["must"] == new["bool"]["must"]
+
+
+def test_utils_extend_query_object_changed_clause():
+    """Test that clauses are compared by their current content"""
+    utils = Utils(None)
+    clause = {"term": {"data.name.keyword": "first"}}
+    old = {"bool": {"must": [clause]}}
+    utils.extend_query_object(old, {"bool": {"must": [clause]}})
+    clause["term"]["data.name.keyword"] = "second"
+    new = {"bool": {"must": [{"term": {"data.name.keyword": "first"}}]}}
+
+    assert len(utils.extend_query_object(old, new)["bool"]["must"]) == 2
+
+
+def test_utils_build_terms_copies_values():
+    """Test that later changes to a list of values leave the query as is"""
+    realizations = [0, 1]
+    terms = Utils(None).build_terms({"fmu.realization.id": realizations})
+    realizations.append(2)
+
+    assert terms == [{"terms": {"fmu.realization.id": [0, 1]}}]
+
+
+def test_utils_iterate_composite_buckets(utils: Utils, case_uuid: str):
+    """Test paging through buckets with a composite aggregation"""
+    field = "fmu.realization.id"
+    query = {"term": {"_sumo.parent_object.keyword": case_uuid}}
+    paged = utils.iterate_composite_buckets([field], query, size=2)
+    values = [bucket["key"][field] for bucket in paged]
+
+    assert len(values) > 2
+    assert values == sorted(set(values))
+    assert values == [b["key"] for b in utils.get_buckets(field, query)]
+
+
+def test_case_surfaces_facets(test_case: Case):
+    """Test getting unique values of several fields in one request"""
+    surfs = test_case.surfaces
+    fields = ["data.name.keyword", "fmu.realization.id"]
+    facets = surfs.facets(fields, doc_counts=True)
+
+    assert set(facets) == set(fields)
+    assert list(facets["data.name.keyword"]) == test_case.surfaces.names
+    assert sum(facets["data.name.keyword"].values()) == len(surfs)
+    assert surfs.realizations == list(facets["fmu.realization.id"])
+
+
+def test_case_surfaces_facets_timestamps(test_case: Case):
+    """Test that facets do not replace the values of timestamps"""
+    expected = test_case.surfaces.timestamps
+    surfs = test_case.surfaces
+    surfs.facets(["data.time.t0.value"])
+
+    assert surfs.timestamps == expected
+
+
+def test_explorer_query_cache(token: str, case_uuid: str):
+    """Test that repeated queries are answered from the cache"""
+    cache = QueryCache()
+    explorer = Explorer("dev", token=token, cache=cache)
+    case = explorer.get_case_by_uuid(case_uuid)
+    names = case.surfaces.names
+    misses = cache.misses
+
+    assert case.surfaces.names == names
+    assert cache.misses == misses
+    assert cache.hits == 1
+
+
+def test_fake_query_cache(fake_sumo: SumoClient):
+    """Test that repeated queries are answered from the cache without
+    Sumo"""
+    cache = QueryCache()
+    explorer = Explorer(sumo=fake_sumo, cache=cache)
+    case = explorer.get_case_by_uuid(FAKE_CASE_UUID)
+    names = case.surfaces.names
+    misses = cache.misses
+
+    assert case.surfaces.names == names == ["surface_0", "surface_1"]
+    assert cache.misses == misses
+    assert cache.hits == 1
+
+
+def test_query_cache_scope_and_pit():
+    """Test that responses are cached per scope, and dropped with their
+    point in time"""
+
+    class Response:
+        content = b"{}"
+
+    cache = QueryCache()
+    query = {"query": {"match_all": {}}}
+    pit_query = {"query": {"match_all": {}}, "pit": {"id": "pit-0"}}
+    cache.put("/search", query, Response(), scope="prod alice")
+    cache.put("/search", pit_query, Response(), scope="prod alice")
+
+    assert cache.get("/search", query, scope="prod bob") is None
+    assert cache.get("/search", query, scope="dev alice") is None
+    assert cache.get("/search", query, scope="prod alice") is not None
+
+    cache.discard_pit({"pit-0"})
+
+    assert cache.get("/search", pit_query, scope="prod alice") is None
+    assert cache.get("/search", query, scope="prod alice") is not None
+
+
+def test_explorer_instrumentation(token: str, case_uuid: str):
+    """Test that requests are recorded per call site"""
+    stats = LatencyAggregator()
+    explorer = Explorer("dev", token=token, instrumentation=stats)
+    case = explorer.get_case_by_uuid(case_uuid)
+    len(case.surfaces)
+
+    summary = stats.summary()
+
+    assert sum(site["count"] for site in summary.values()) == 2
+    assert all(__file__ in call_site for call_site in summary)
+    assert all(site["p99"] >= site["p50"] for site in summary.values())
+
+
+def test_explorer_failing_hook(caplog):
+    """Test that an instrumentation hook raising does not fail requests
+    or keep other hooks from recording them"""
+
+    class Client:
+        def get(self, path: str, params=None):
+            return {"asset": ["read"]}
+
+    class FailingHook:
+        def record(self, event):
+            raise RuntimeError("hook failed")
+
+    stats = LatencyAggregator()
+    explorer = Explorer(sumo=Client(), instrumentation=[FailingHook(), stats])
+
+    with caplog.at_level(logging.ERROR):
+        assert explorer.get_permissions("asset") == {"asset": ["read"]}
+
+    assert "hook failed" in caplog.text
+    assert sum(site["count"] for site in stats.summary().values()) == 1
+
+
+def test_explorer_replay(token: str, case_uuid: str, tmp_path: Path):
+    """Test that a recorded session is replayed without Sumo"""
+    cassette = str(tmp_path / "session.jsonl")
+
+    with Explorer("dev", token=token, record=cassette) as explorer:
+        surfs = explorer.get_case_by_uuid(case_uuid).surfaces
+        recorded = (surfs.names, len(surfs), surfs[0].blob.read())
+
+    replay = Explorer(sumo=ReplayClient(cassette, timing="zero"))
+    surfs = replay.get_case_by_uuid(case_uuid).surfaces
+
+    assert (surfs.names, len(surfs), surfs[0].blob.read()) == recorded
+
+    with pytest.raises(Exception):
+        surfs.filter(name="not_recorded").names
+
+
+def test_recording_redacts_secrets(tmp_path: Path):
+    """Test that authorization URIs and tokens are left out of cassettes,
+    and that the cassette is not kept open between requests"""
+
+    class Client:
+        def get(self, path: str, params=None):
+            if path.endswith("/authuri"):
+                return b"https://blob/abc?sv=1&sig=secret"
+
+            return {"token": "secret", "url": "https://blob/abc?sig=secret"}
+
+    cassette = tmp_path / "session.jsonl"
+    client = RecordingClient(Client(), str(cassette))
+
+    assert client.get("/objects('abc')/blob/authuri").endswith(b"secret")
+    assert client.get("/userdata")["token"] == "secret"
+
+    cassette.rename(tmp_path / "moved.jsonl")
+    client.get("/userdata")
+    client.close()
+    client.get("/userdata")
+
+    assert "secret" not in (tmp_path / "moved.jsonl").read_text()
+    assert len(cassette.read_text().splitlines()) == 1
+
+    replay = ReplayClient(str(tmp_path / "moved.jsonl"), timing="zero")
+
+    assert replay.get("/userdata")["token"] == "REDACTED"
+
+
+def test_explorer_blob_cache(token: str, case_uuid: str, tmp_path: Path):
+    """Test that blobs are read from the blob cache when present"""
+    cache = BlobCache(str(tmp_path))
+    explorer = Explorer("dev", token=token, blob_cache=cache)
+    case = explorer.get_case_by_uuid(case_uuid)
+    uuid = case.surfaces[0].uuid
+    blob = explorer.get_surface_by_uuid(uuid).blob.read()
+
+    assert cache.misses == 1
+    assert explorer.get_surface_by_uuid(uuid).blob.read() == blob
+    assert cache.hits == 1
+
+
+def test_fake_blob_cache(fake_sumo: SumoClient, tmp_path: Path):
+    """Test that blobs are read from the blob cache without Sumo"""
+    cache = BlobCache(str(tmp_path))
+    explorer = Explorer(sumo=fake_sumo, blob_cache=cache)
+    uuid = explorer.get_case_by_uuid(FAKE_CASE_UUID).surfaces[0].uuid
+    values = explorer.get_surface_by_uuid(uuid).to_regular_surface().values
+
+    assert cache.misses == 1
+
+    surface = explorer.get_surface_by_uuid(uuid).to_regular_surface()
+
+    assert np.ma.allclose(surface.values, values)
+    assert cache.hits == 1
+
+
+def test_blob_cache_bound(tmp_path: Path):
+    """Test that the blob cache stays within its size, counting and
+    removing temporary files left by interrupted writes"""
+    stale = tmp_path / "interrupted.tmp"
+    stale.write_bytes(b"x" * 100)
+    os.utime(stale, (0, 0))
+    cache = BlobCache(str(tmp_path), max_bytes=250)
+
+    for i in range(5):
+        cache.put(f"blob-{i}", bytes(100))
+
+    files = list(tmp_path.iterdir())
+
+    assert not stale.exists()
+    assert sum(path.stat().st_size for path in files) <= 250
+    assert cache.get("blob-4") == bytes(100)
+    assert cache.get("blob-0") is None
+
+
+def test_blob_cache_shared_bound(tmp_path: Path):
+    """Test that blob caches sharing a directory keep it within its size"""
+    caches = [BlobCache(str(tmp_path), max_bytes=1000) for _ in range(4)]
+
+    for i, cache in enumerate(caches):
+        cache.put(f"blob-{i}-0", bytes(100))
+
+    for i, cache in enumerate(caches):
+        for j in range(1, 7):
+            cache.put(f"blob-{i}-{j}", bytes(100))
+
+    assert sum(path.stat().st_size for path in tmp_path.iterdir()) <= 1000
+
+
+def test_case_surfaces_to_metadata_frame(test_case: Case):
+    """Test exporting selected metadata of a collection as a DataFrame"""
+    surfs = test_case.surfaces
+    frame = surfs.to_metadata_frame(["data.name", "fmu.realization.id"])
+
+    assert list(frame.columns) == ["_id", "data.name", "fmu.realization.id"]
+    assert len(frame) == len(surfs)
+    assert sorted(frame["data.name"].unique()) == sorted(surfs.names)
+
+
+def test_case_surfaces_to_metadata_frame_scalar(test_case: Case):
+    """Test that default metadata columns are scalar, and that fields
+    holding objects or lists are refused"""
+    frame = test_case.surfaces.to_metadata_frame(arrow=True)
+
+    assert "access.asset.name" in frame.column_names
+    assert all(
+        not pa.types.is_nested(column.type) for column in frame.columns
+    )
+
+    for field in ["access.asset", "masterdata.smda.field.identifier"]:
+        with pytest.raises(ValueError, match=field):
+            test_case.surfaces.to_metadata_frame([field])